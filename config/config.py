@@ -15,6 +15,7 @@ CREDENTIALS_DIR = os.path.join(BASE_DIR, 'credentials')
 # File paths
 PROMPT_PATH = os.path.join(DOCS_DIR, 'prompts', 'reporting_prompt.txt')
 SQL_TEMPLATE_PATH = os.path.join(DOCS_DIR, 'query_templates', 'branch_report.sql')
+SQL_BATCH_TEMPLATE_PATH = os.path.join(DOCS_DIR, 'query_templates', 'branch_report_batch.sql')
 OUTPUT_DIR = os.path.join(DATA_DIR, 'reports')
 
 # Ensure output directory exists
@@ -22,8 +23,13 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 # AI Configuration
 AI_PROVIDER = "claude"  # Options: "gpt-4", "claude"
-CLAUDE_MODEL = "claude-sonnet-4-20250514"
+CLAUDE_MODEL = "claude-sonnet-4-20250514"  # Used for complex prompts and premium runs
+HAIKU_MODEL = "claude-haiku-4-5-20251001"  # Used for parameter extraction and simple sections
 GPT_MODEL = "gpt-4"
+AI_HTTP_TIMEOUT = 60.0  # Seconds per AI API request
+AI_MAX_CONNECTIONS = 100  # Upper bound on open connections in the shared HTTP/2 pool
+AI_MAX_KEEPALIVE = 20  # Idle connections kept open for reuse
+AI_CONSOLIDATED_SECTIONS = False  # Generate all report sections in one JSON request
 
 # BigQuery Configuration
 PROJECT_ID = "hdma1-242116"
@@ -41,6 +47,23 @@ try:
 except ImportError:
     print("Warning: python-dotenv not found. Make sure API keys are set in environment.")
 
+# Semantic AI response cache (opt-in: set SEMANTIC_CACHE=true)
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE", "false").lower() in ("1", "true", "yes")
+SEMANTIC_CACHE_DIR = os.path.join(DATA_DIR, 'ai_cache')
+SEMANTIC_CACHE_THRESHOLD = 0.95  # Minimum cosine similarity for a cache hit
+SEMANTIC_CACHE_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Generated report sections, keyed by a fingerprint of the report data (set AI_SECTION_CACHE=false to disable)
+AI_SECTION_CACHE_ENABLED = os.getenv("AI_SECTION_CACHE", "true").lower() in ("1", "true", "yes")
+AI_SECTION_CACHE_DIR = os.path.join(DATA_DIR, 'ai_cache', 'sections')
+AI_SECTION_CACHE_TTL_HOURS = 24 * 7  # Cached sections older than this are regenerated
+AI_SECTION_CACHE_MAX_ENTRIES = 500  # Oldest entries beyond this are deleted
+
+# Finished Excel/PDF reports, reused for the same counties, years, AI model and data (set REPORT_CACHE=true to enable)
+REPORT_CACHE_ENABLED = os.getenv("REPORT_CACHE", "false").lower() in ("1", "true", "yes")
+REPORT_CACHE_DIR = os.path.join(OUTPUT_DIR, 'cache')
+REPORT_CACHE_TTL_HOURS = 24  # Cached reports older than this are regenerated
+
 # BigQuery credentials from environment variables
 def get_bq_credentials():
     """Get BigQuery credentials from environment variables."""
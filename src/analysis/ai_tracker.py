@@ -5,45 +5,35 @@ AI analysis wrapper that tracks token usage and costs for logging.
 
 import sys
 import os
-from typing import Dict, Any, Optional
-import json
-import pandas as pd
-import numpy as np
+import threading
+from typing import Callable, Optional
 
 # Add the src directory to the Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from src.analysis.gpt_utils import AIAnalyzer, ask_ai, convert_numpy_types
+from src.analysis.gpt_utils import AIAnalyzer, ask_ai, REPORT_SECTION_KEYS
 from src.utils.run_logger import run_logger
 from config import AI_PROVIDER, CLAUDE_MODEL, GPT_MODEL
 
-def convert_dataframe_to_json_serializable(data: Any) -> Any:
-    """Convert DataFrame and numpy types to JSON-serializable format."""
-    if isinstance(data, pd.DataFrame):
-        # Convert DataFrame to records and handle numpy types
-        records = data.to_dict('records')
-        return convert_numpy_types(records)
-    elif isinstance(data, dict):
-        # Recursively convert dictionary values
-        return {key: convert_dataframe_to_json_serializable(value) for key, value in data.items()}
-    elif isinstance(data, list):
-        # Recursively convert list items
-        return [convert_dataframe_to_json_serializable(item) for item in data]
-    else:
-        # Use the existing numpy type conversion
-        return convert_numpy_types(data)
-
-class TrackedAIAnalyzer:
-    """AI Analyzer wrapper that tracks usage for logging."""
+class TrackedAIAnalyzer(AIAnalyzer):
+    """
+    AI Analyzer that tracks usage for logging.
+    
+    Every provider call goes through _call_ai, so the report's own section
+    prompts, its consolidated request and its section cache are used unchanged
+    while token usage is added to the run's metadata.
+    """
     
     def __init__(self, run_id: str, progress_tracker=None):
         """Initialize the tracked AI analyzer."""
+        super().__init__()
         self.run_id = run_id
-        self.analyzer = AIAnalyzer()
         self.total_input_tokens = 0
         self.total_output_tokens = 0
         self.call_count = 0
         self.progress_tracker = progress_tracker
+        # Sections are generated concurrently; guards the counters and run metadata updates
+        self._lock = threading.Lock()
         
         # Update run metadata with AI provider info
         run_logger.update_run(
@@ -52,110 +42,49 @@ class TrackedAIAnalyzer:
             ai_model=CLAUDE_MODEL if AI_PROVIDER == "claude" else GPT_MODEL
         )
     
-    def _call_ai_with_tracking(self, prompt: str, max_tokens: int = 1000, temperature: float = 0.3, call_index: int = None, total_calls: int = None) -> str:
+    def _call_ai(self, prompt: str, max_tokens: int = 1000, temperature: float = 0.3, model: Optional[str] = None,
+                 stream_callback: Optional[Callable[[str], None]] = None, system: Optional[str] = None,
+                 section: Optional[str] = None) -> str:
         """Make an AI call and track token usage."""
         try:
-            # Make the actual AI call
-            response = self.analyzer._call_ai(prompt, max_tokens, temperature)
-            
-            # Estimate token usage (rough approximation)
-            input_tokens = len(prompt.split()) * 1.3  # Rough estimate
-            output_tokens = len(response.split()) * 1.3  # Rough estimate
+            model = model or self._select_model(prompt)
+            response = super()._call_ai(prompt, max_tokens, temperature, model=model,
+                                        stream_callback=stream_callback, system=system, section=section)
             
-            # Update tracking
-            self.total_input_tokens += int(input_tokens)
-            self.total_output_tokens += int(output_tokens)
-            self.call_count += 1
+            # Use the provider's reported token usage, falling back to a rough estimate
+            usage = self.last_usage
+            if usage:
+                input_tokens = usage['input_tokens']
+                output_tokens = usage['output_tokens']
+            else:
+                input_tokens = len(f"{system or ''} {prompt}".split()) * 1.3  # Rough estimate
+                output_tokens = len(response.split()) * 1.3  # Rough estimate
             
-            # Update progress if tracker is available
-            if self.progress_tracker and call_index is not None and total_calls is not None:
-                self.progress_tracker.update_ai_progress(call_index + 1, total_calls)
-            
-            # Update run metadata
-            run_logger.update_run(
-                self.run_id,
-                ai_calls=self.call_count,
-                ai_input_tokens=self.total_input_tokens,
-                ai_output_tokens=self.total_output_tokens
-            )
+            with self._lock:
+                # Update tracking
+                self.total_input_tokens += int(input_tokens)
+                self.total_output_tokens += int(output_tokens)
+                self.call_count += 1
+                
+                # Update progress if tracker is available (calls may finish out of order, so report the count done)
+                if self.progress_tracker:
+                    total_calls = len(REPORT_SECTION_KEYS)
+                    self.progress_tracker.update_ai_progress(min(self.call_count, total_calls), total_calls)
+                
+                # Update run metadata
+                run_logger.update_run(
+                    self.run_id,
+                    ai_model=usage['model'] if usage else model,
+                    ai_calls=self.call_count,
+                    ai_input_tokens=self.total_input_tokens,
+                    ai_output_tokens=self.total_output_tokens
+                )
             
             return response
             
         except Exception as e:
             print(f"Error in tracked AI call: {e}")
             return ""
-    
-    def generate_executive_summary(self, data: Dict[str, Any]) -> str:
-        """Generate executive summary with tracking."""
-        # Convert data to JSON-serializable format
-        json_data = convert_dataframe_to_json_serializable(data)
-        
-        prompt = f"""
-        Generate executive summary for: Counties: {json_data.get('counties', [])} | Years: {json_data.get('years', [])} | Branches: {json_data.get('total_branches', 0)} | Top banks: {json_data.get('top_banks', [])}
-        Highlight key trends and data insights without speculation.
-        """
-        
-        return self._call_ai_with_tracking(prompt, max_tokens=800, call_index=0, total_calls=6)
-    
-    def generate_key_findings(self, data: Dict[str, Any]) -> str:
-        """Generate key findings with tracking."""
-        # Convert data to JSON-serializable format
-        json_data = convert_dataframe_to_json_serializable(data)
-        
-        prompt = f"""
-        Generate 3-5 key findings for: Counties: {json_data.get('counties', [])} | Years: {json_data.get('years', [])} | Data: {json.dumps(json_data.get('data', []), indent=2)}
-        Focus on market trends and community patterns observable in data.
-        """
-        
-        return self._call_ai_with_tracking(prompt, max_tokens=600, call_index=1, total_calls=6)
-    
-    def generate_trends_analysis(self, data: Dict[str, Any]) -> str:
-        """Generate trends analysis with tracking."""
-        # Convert data to JSON-serializable format
-        json_data = convert_dataframe_to_json_serializable(data)
-        
-        prompt = f"""
-        Analyze trends in: Counties: {json_data.get('counties', [])} | Years: {json_data.get('years', [])} | Data: {json.dumps(json_data.get('data', []), indent=2)}
-        Describe year-over-year changes and market patterns without inferring causes.
-        """
-        
-        return self._call_ai_with_tracking(prompt, max_tokens=700, call_index=2, total_calls=6)
-    
-    def generate_bank_strategies_analysis(self, data: Dict[str, Any]) -> str:
-        """Generate bank strategies analysis with tracking."""
-        # Convert data to JSON-serializable format
-        json_data = convert_dataframe_to_json_serializable(data)
-        
-        prompt = f"""
-        Analyze market patterns in: Counties: {json_data.get('counties', [])} | Years: {json_data.get('years', [])} | Banks: {json_data.get('top_banks', [])} | Data: {json.dumps(json_data.get('data', []), indent=2)}
-        Describe competitive dynamics observable in data without strategic speculation.
-        """
-        
-        return self._call_ai_with_tracking(prompt, max_tokens=700, call_index=3, total_calls=6)
-    
-    def generate_community_impact_analysis(self, data: Dict[str, Any]) -> str:
-        """Generate community impact analysis with tracking."""
-        # Convert data to JSON-serializable format
-        json_data = convert_dataframe_to_json_serializable(data)
-        
-        prompt = f"""
-        Analyze community patterns in: Counties: {json_data.get('counties', [])} | Years: {json_data.get('years', [])} | Data: {json.dumps(json_data.get('data', []), indent=2)}
-        Describe financial access patterns without speculating about inclusion strategies.
-        """
-        
-        return self._call_ai_with_tracking(prompt, max_tokens=700, call_index=4, total_calls=6)
-    
-    def generate_conclusion(self, data: Dict[str, Any]) -> str:
-        """Generate conclusion with tracking."""
-        # Convert data to JSON-serializable format
-        json_data = convert_dataframe_to_json_serializable(data)
-        
-        prompt = f"""
-        Synthesize insights for: Counties: {json_data.get('counties', [])} | Years: {json_data.get('years', [])} | Branches: {json_data.get('total_branches', 0)} | Banks: {json_data.get('top_banks', [])} | Data: {json.dumps(json_data.get('data', []), indent=2)}
-        Provide data-based observations without policy recommendations.
-        """
-        
-        return self._call_ai_with_tracking(prompt, max_tokens=500, call_index=5, total_calls=6)
 
 
 def track_ai_call(run_id: str, prompt: str, max_tokens: int = 1000) -> str:
@@ -3,57 +3,274 @@
 AI analysis utilities for FDIC bank branch data using GPT-4 and Claude.
 """
 
-import sys
 import os
-import json
-import numpy as np
-from typing import List, Tuple, Dict, Any
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'config'))
-from config import AI_PROVIDER, CLAUDE_MODEL, GPT_MODEL
-
-# Always load the Claude API key from the environment
+import re
+import time
+import asyncio
+import hashlib
+import threading
+import orjson
+from typing import List, Tuple, Dict, Any, Optional, Callable
+from pydantic import BaseModel, ValidationError
+from tenacity import retry, stop_after_attempt, wait_exponential_jitter, retry_if_exception
+from config import AI_PROVIDER, CLAUDE_MODEL, HAIKU_MODEL, GPT_MODEL, AI_HTTP_TIMEOUT, AI_MAX_CONNECTIONS, AI_MAX_KEEPALIVE, SEMANTIC_CACHE_ENABLED, AI_CONSOLIDATED_SECTIONS
+from src.analysis.section_cache import load_sections, save_sections
+
+# Always load the API keys from the environment
 CLAUDE_API_KEY = os.getenv("CLAUDE_API_KEY")
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+# Model used for the configured provider
+AI_MODEL = GPT_MODEL if AI_PROVIDER == "openai" else CLAUDE_MODEL
+
+# Cheaper model for extraction and formulaic narration (Claude only)
+FAST_MODEL = HAIKU_MODEL if AI_PROVIDER == "claude" else AI_MODEL
+
+# Prompts longer than this (in characters) are routed to the full model
+COMPLEX_PROMPT_CHARS = 12000
+
+# Banks included in prompts (by deposit market share); keeps prompt size
+# bounded in counties with hundreds of institutions
+PROMPT_TOP_BANKS = 10
+
+# Shared provider client, created on first use by _get_client()
+_client = None
+
+def _http_client():
+    """
+    Build the long-lived HTTP/2 client shared by every AI request.
+    
+    Passing it to the provider SDK keeps one connection pool for the whole
+    process, so sequential section calls reuse the same TLS connection.
+    """
+    import httpx
+    return httpx.Client(
+        http2=True,
+        timeout=AI_HTTP_TIMEOUT,
+        limits=httpx.Limits(max_connections=AI_MAX_CONNECTIONS, max_keepalive_connections=AI_MAX_KEEPALIVE)
+    )
+
+def _get_client():
+    """
+    Return the shared client for the configured AI provider.
+    
+    The provider SDK is imported lazily so that code paths which never call
+    the AI (e.g. parameter validation) don't pay for importing it.
+    Returns None if the provider's API key is not set.
+    """
+    global _client
+    if _client is None:
+        if AI_PROVIDER == "openai":
+            if OPENAI_API_KEY:
+                from openai import OpenAI
+                _client = OpenAI(api_key=OPENAI_API_KEY, http_client=_http_client())
+        elif AI_PROVIDER == "claude":
+            if CLAUDE_API_KEY:
+                import anthropic
+                _client = anthropic.Anthropic(api_key=CLAUDE_API_KEY, http_client=_http_client())
+        else:
+            raise Exception(f"Unsupported AI provider: {AI_PROVIDER}")
+    return _client
+
+def close_client():
+    """Close the shared provider client and its connection pool; the next call creates a new one."""
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
 
-# Import the appropriate client based on provider
-if AI_PROVIDER == "openai":
-    from openai import OpenAI
-    client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
-elif AI_PROVIDER == "claude":
-    import anthropic
-    client = anthropic.Anthropic(api_key=CLAUDE_API_KEY) if CLAUDE_API_KEY else None
-else:
-    client = None
-
-def convert_numpy_types(obj):
-    """Convert numpy types to native Python types for JSON serialization."""
-    if isinstance(obj, np.integer):
-        return int(obj)
-    elif isinstance(obj, np.floating):
-        return float(obj)
-    elif isinstance(obj, np.ndarray):
-        return obj.tolist()
-    elif isinstance(obj, dict):
-        return {key: convert_numpy_types(value) for key, value in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_numpy_types(item) for item in obj]
+class StreamInterruptedError(Exception):
+    """A streamed response failed after part of it was passed to the stream callback."""
+
+
+def _is_transient_error(exc: BaseException) -> bool:
+    """True for errors worth retrying: rate limits, server errors and dropped connections."""
+    import httpx
+    if AI_PROVIDER == "openai":
+        import openai as sdk
     else:
-        return obj
+        import anthropic as sdk
+    return isinstance(exc, (sdk.APIConnectionError, sdk.RateLimitError, sdk.InternalServerError, httpx.TransportError))
+
+
+# Prompt templates. Bump PROMPT_VERSION whenever a template changes so that
+# cached AI responses keyed on it are invalidated.
+PROMPT_VERSION = "v8"
+
+_DEFINITIONS = """IMPORTANT DEFINITIONS:
+        - LMICT = Low-to-Moderate Income Census Tracts (areas with median family income below 80% of area median)
+        - MMCT = Majority-Minority Census Tracts (areas where minority populations represent more than 50% of total population)
+        - LMI/MMCT = Branches serving both low-to-moderate income and majority-minority communities"""
+
+EXTRACTION_TMPL = """
+You are a data extraction assistant following NCRC guidelines. Extract counties and years from this request:
+
+{prompt}
+
+Respond with ONLY this JSON format:
+{{
+    "counties": ["County, Full State Name"],
+    "years": [2020, 2021, 2022]
+}}
+
+Rules:
+- Use "County, Full State Name" format (e.g., "Los Angeles, California")
+- Major cities don't need state names unless for disambiguation
+- Default counties: "Los Angeles, California", "New York, New York", "Cook, Illinois"
+- Default years: [2020, 2021, 2022]
+"""
+
+# Names the county and period in every section instruction
+REPORT_HEADER_TMPL = "for the bank branch analysis of {county} from {first_year} to {last_year}"
+
+# Data and definitions shared by the per-section context and the consolidated sections prompt
+_DATA_BLOCK = """
+        Branch trends: {trends_json}
+        Top {top_n} banks by deposit market share: {market_shares_json}
+        Bank-level growth for the largest banks (at most {top_n}): {bank_analysis_json}
+        Bank vs. county comparisons: {comparisons_json}
+
+        """ + _DEFINITIONS
+
+# Shared data context sent ahead of every section instruction. It is identical
+# for all sections of a report, so the provider can cache it as a prompt prefix.
+REPORT_CONTEXT_TMPL = """
+        Bank branch data for {county} from {first_year} to {last_year}.
+""" + _DATA_BLOCK
 
-def ask_ai(prompt: str) -> str:
-    """Send a prompt to the configured AI provider and return the response."""
+EXEC_SUMMARY_TMPL = """
+        Respond in at most 250 words.
+        Generate a concise executive summary {header}, using the branch trends and the top {top_n} banks:
+
+        Focus on:
+        - Key trends in branch counts
+        - Market concentration among major banks
+        - MMCT percentage changes around 2022 (2020 census effect)
+        - 2-3 paragraphs maximum
+
+        Describe observable patterns without suggesting underlying causes.
+        """
+
+KEY_FINDINGS_TMPL = """
+        Respond in at most 250 words.
+        Generate 3-5 key findings {header}, using the branch trends and the top {top_n} banks:
+
+        Focus on:
+        - Most significant trends and patterns
+        - MMCT changes around 2022 (2020 census effect)
+        - Actionable data observations
+        - Format as bullet points starting with "•"
+
+        Present factual patterns without speculating about strategic implications.
+        """
+
+OVERALL_TRENDS_TMPL = """
+        Respond in at most 250 words.
+        Analyze overall branch trends {header}, using the branch trends:
+
+        Focus on:
+        - Overall branch count trends and year-over-year changes
+        - MMCT percentage changes around 2022 (2020 census effect)
+        - Three categories: LMICT, MMCT, and LMI/MMCT
+        - Comparison to broader patterns where relevant
+        - 2-3 paragraphs maximum
+
+        Describe what the data demonstrates without attributing intent.
+        """
+
+BANK_STRATEGIES_TMPL = """
+        Respond in at most 250 words.
+        Analyze market concentration {header}, using the top banks and the bank-level analysis:
+
+        Focus on:
+        - Market concentration patterns among major banks
+        - Performance differences in serving LMICT, MMCT, and LMI/MMCT communities
+        - MMCT changes around 2022 (2020 census effect)
+        - Competitive dynamics observable in data
+        - 2-3 paragraphs maximum
+
+        Report measurable patterns without speculating about bank strategies.
+        """
+
+COMMUNITY_IMPACT_TMPL = """
+        Respond in at most 250 words.
+        Analyze community banking patterns {header}, using the top banks and the bank vs. county comparisons:
+
+        Focus on:
+        - How banks serve different community types (LMICT, MMCT, LMI/MMCT)
+        - Bank performance compared to county averages
+        - 2020 census impact on MMCT designations (effective 2022)
+        - Observable access patterns in data
+        - 2-3 paragraphs maximum
+
+        Describe banking access patterns without inferring underlying causes.
+        """
+
+CONCLUSION_TMPL = """
+        Respond in at most 250 words.
+        Generate a conclusion {header}, using the branch trends and the top {top_n} banks:
+
+        Focus on:
+        - Key data patterns using proper formatting
+        - Three community categories (LMICT, MMCT, LMI/MMCT)
+        - 2020 census impact on MMCT data
+        - Observable trends and their measurable effects
+        - 2-3 paragraphs maximum
+
+        Synthesize key data insights without making policy suggestions.
+        """
+
+REPORT_SECTIONS_TMPL = """
+        Write the narrative sections of a bank branch analysis of {county} from {first_year} to {last_year}.
+""" + _DATA_BLOCK + """
+
+        Respond with ONLY a JSON object with exactly these string fields, each at most 250 words:
+        {{
+            "executive_summary": "2-3 paragraphs on key trends in branch counts, market concentration among major banks and MMCT changes around 2022 (2020 census effect)",
+            "key_findings": "3-5 bullet points starting with \\"•\\", one per line, on the most significant trends and patterns",
+            "overall_trends": "2-3 paragraphs on branch count trends, year-over-year changes and the LMICT, MMCT and LMI/MMCT categories"
+        }}
+
+        Describe observable patterns without suggesting underlying causes, bank strategies or policy.
+        Use \\n\\n between paragraphs inside a field.
+        """
+
+# Maximum attempts at getting valid JSON from the consolidated sections request
+REPORT_SECTIONS_ATTEMPTS = 3
+
+# Sections the PDF report renders, in report order; generate_all and
+# generate_report_sections produce exactly these
+REPORT_SECTION_KEYS = ['executive_summary', 'key_findings', 'overall_trends']
+
+def to_json(obj: Any) -> str:
+    """Serialize analysis data, including numpy scalars and arrays, to indented JSON."""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY).decode()
+
+def ask_ai(prompt: str, model: Optional[str] = None, json_response: bool = False) -> str:
+    """
+    Send a prompt to the configured AI provider and return the response.
+    
+    With json_response, OpenAI is put in JSON mode so the reply is always a
+    valid JSON object; Claude relies on the prompt asking for JSON only.
+    """
+    client = _get_client()
     if not client:
         raise Exception(f"No AI client configured for provider: {AI_PROVIDER}")
     
+    model = model or AI_MODEL
     try:
         if AI_PROVIDER == "openai":
+            extra = {'response_format': {"type": "json_object"}} if json_response else {}
             response = client.chat.completions.create(
-                model=OPENAI_MODEL,
-                messages=[{"role": "user", "content": prompt}]
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                **extra
             )
             return response.choices[0].message.content
         elif AI_PROVIDER == "claude":
             response = client.messages.create(
-                model=CLAUDE_MODEL,
+                model=model,
                 max_tokens=4000,
                 messages=[{"role": "user", "content": prompt}]
             )
@@ -67,6 +284,17 @@ def ask_gpt(prompt: str) -> str:
     """Legacy function name for backward compatibility."""
     return ask_ai(prompt)
 
+# Attempts at getting a valid extraction response before giving up
+EXTRACTION_ATTEMPTS = 3
+
+# Outermost JSON object in a model response
+_JSON_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+class ExtractionSchema(BaseModel):
+    """Expected shape of the parameter extraction response."""
+    counties: List[str]
+    years: List[int]
+
 def extract_parameters(prompt: str) -> Tuple[List[str], List[int]]:
     """
     Extract counties and years from a natural language prompt using AI.
@@ -77,37 +305,31 @@ def extract_parameters(prompt: str) -> Tuple[List[str], List[int]]:
     Returns:
         Tuple of (counties, years) where counties is a list of strings and years is a list of integers
     """
-    extraction_prompt = f"""
-You are a data extraction assistant following NCRC guidelines. Extract counties and years from this request:
-
-{prompt}
-
-Respond with ONLY this JSON format:
-{{
-    "counties": ["County, Full State Name"],
-    "years": [2020, 2021, 2022]
-}}
-
-Rules:
-- Use "County, Full State Name" format (e.g., "Los Angeles, California")
-- Major cities don't need state names unless for disambiguation
-- Default counties: "Los Angeles, California", "New York, New York", "Cook, Illinois"
-- Default years: [2020, 2021, 2022]
-"""
+    extraction_prompt = EXTRACTION_TMPL.format(prompt=prompt)
 
     try:
-        response = ask_ai(extraction_prompt)
-        
-        # Clean the response to extract JSON
-        json_match = re.search(r'\{.*\}', response, re.DOTALL)
-        if not json_match:
-            raise Exception("No JSON found in AI response")
-        
-        json_str = json_match.group()
-        data = json.loads(json_str)
+        request = extraction_prompt
+        for attempt in range(EXTRACTION_ATTEMPTS):
+            response = ask_ai(request, model=FAST_MODEL, json_response=True)
+            
+            try:
+                # Clean the response to extract JSON
+                json_match = _JSON_RE.search(response)
+                if not json_match:
+                    raise ValueError("No JSON found in AI response")
+                
+                data = ExtractionSchema.model_validate(orjson.loads(json_match.group()))
+                break
+            except (ValueError, ValidationError) as e:
+                if attempt == EXTRACTION_ATTEMPTS - 1:
+                    raise Exception(f"Failed to parse JSON from AI response: {e}")
+                # Retry with the error fed back to the model, backing off linearly
+                request = (f"{extraction_prompt}\n\nYour previous output had error: {e}. "
+                           "Return ONLY a JSON object matching the schema.")
+                time.sleep(1.0 * (attempt + 1))
         
-        counties = data.get('counties', [])
-        years = data.get('years', [])
+        counties = data.counties
+        years = data.years
         
         if not counties:
             raise Exception("No counties extracted from prompt")
@@ -116,8 +338,6 @@ Rules:
         
         return counties, years
         
-    except json.JSONDecodeError as e:
-        raise Exception(f"Failed to parse JSON from AI response: {e}")
     except Exception as e:
         raise Exception(f"Error extracting parameters: {e}")
 
@@ -134,254 +354,441 @@ def validate_parameters(counties: List[str], years: List[int]) -> bool:
     
     return True
 
+def _classify_complexity(prompt: str, county: str = "") -> str:
+    """
+    Classify a prompt as 'complex' or 'simple' for model routing.
+    
+    Long prompts and multi-county (combined) analyses are complex; everything
+    else is formulaic narration that the fast model handles well.
+    """
+    if len(prompt) > COMPLEX_PROMPT_CHARS or ' and ' in county:
+        return 'complex'
+    return 'simple'
+
 class AIAnalyzer:
-    def __init__(self):
-        if AI_PROVIDER == "openai":
-            from openai import OpenAI
-            self.client = OpenAI(api_key=OPENAI_API_KEY)
-        elif AI_PROVIDER == "claude":
-            import anthropic
-            self.client = anthropic.Anthropic(api_key=CLAUDE_API_KEY)
-        else:
-            raise Exception(f"Unsupported AI provider: {AI_PROVIDER}")
+    def __init__(self, premium: bool = False):
+        """
+        Initialize the AI analyzer.
+        
+        Args:
+            premium: Always use the full model instead of routing simple prompts to the fast model
+        """
+        if _get_client() is None:
+            raise Exception(f"No AI client configured for provider: {AI_PROVIDER}")
         
         self.provider = AI_PROVIDER
-        self.model = OPENAI_MODEL if AI_PROVIDER == "openai" else CLAUDE_MODEL
+        self.model = AI_MODEL
+        self.premium = premium
+        # Per-thread storage for last_usage, so concurrent section calls don't overwrite each other's
+        self._local = threading.local()
+        # Most recent _serialize_inputs result, with the inputs it was built from
+        self._serialized = None
+        self._serialized_key = None
+        self._serialized_source = None
+        self._serialize_lock = threading.Lock()
         
-    def _call_ai(self, prompt: str, max_tokens: int = 1000, temperature: float = 0.3) -> str:
-        """Make a call to the configured AI provider."""
+        # Optional semantic response cache (see semantic_cache.py)
+        self.cache = None
+        if SEMANTIC_CACHE_ENABLED:
+            from src.analysis.semantic_cache import get_semantic_cache
+            self.cache = get_semantic_cache()
+        
+    @property
+    def last_usage(self) -> Optional[Dict[str, Any]]:
+        """Token usage reported by the provider for the most recent call made on this thread."""
+        return getattr(self._local, 'usage', None)
+    
+    @last_usage.setter
+    def last_usage(self, usage: Optional[Dict[str, Any]]):
+        self._local.usage = usage
+    
+    @property
+    def client(self):
+        """The shared provider client (one connection pool for all analyzers)."""
+        return _get_client()
+    
+    def close(self):
+        """Release the shared connection pool, e.g. at the end of a CLI run."""
+        close_client()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _select_model(self, prompt: str, county: str = "") -> str:
+        """Pick the model for a prompt based on its complexity."""
+        if self.premium or _classify_complexity(prompt, county) == 'complex':
+            return self.model
+        return FAST_MODEL
+        
+    def _call_ai(self, prompt: str, max_tokens: int = 1000, temperature: float = 0.3, model: Optional[str] = None,
+                 stream_callback: Optional[Callable[[str], None]] = None, system: Optional[str] = None,
+                 section: Optional[str] = None) -> str:
+        """
+        Make a call to the configured AI provider.
+        
+        Claude responses are streamed; if stream_callback is given it receives each
+        text chunk as it arrives, so callers can render partial output.
+        system is a context block shared by several calls. It is sent ahead of the
+        prompt and marked cacheable, so repeated calls only pay for it once.
+        When the semantic cache is enabled, near-identical prompts are answered
+        from the cache without an API call. Only the instruction in prompt is
+        matched by similarity; the data block (system) and the section name must
+        match exactly. A prompt without a separate data block carries its own
+        data, so it is only answered from the cache when repeated exactly.
+        """
+        self.last_usage = None
+        model = model or self._select_model(prompt)
+        
+        if self.cache:
+            data_hash = hashlib.sha256((system if system is not None else prompt).encode()).hexdigest()
+            namespace = f"{PROMPT_VERSION}|{self.provider}|{model}|{max_tokens}|{temperature}|{section}|{data_hash}"
+            cache_key = prompt
+            cached = self.cache.lookup(cache_key, namespace)
+            if cached is not None:
+                self.last_usage = {'model': model, 'input_tokens': 0, 'output_tokens': 0}
+                if stream_callback:
+                    stream_callback(cached)
+                return cached
+            response = self._call_provider(prompt, max_tokens, temperature, model, stream_callback, system)
+            if response:
+                self.cache.store(cache_key, namespace, response, provider=self.provider, model=model)
+            return response
+        
+        return self._call_provider(prompt, max_tokens, temperature, model, stream_callback, system)
+    
+    def _call_provider(self, prompt: str, max_tokens: int, temperature: float, model: str,
+                       stream_callback: Optional[Callable[[str], None]] = None, system: Optional[str] = None) -> str:
+        """Send a prompt to the provider API, returning "" if it still fails after retries."""
         try:
-            if self.provider == "openai":
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=max_tokens,
-                    temperature=temperature
-                )
-                return response.choices[0].message.content.strip()
-            elif self.provider == "claude":
-                response = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                return response.content[0].text.strip()
+            return self._request(prompt, max_tokens, temperature, model, stream_callback, system)
         except Exception as e:
             print(f"Error calling {self.provider} API: {e}")
             return ""
+    
+    @retry(stop=stop_after_attempt(4), wait=wait_exponential_jitter(1, 10),
+           retry=retry_if_exception(_is_transient_error), reraise=True)
+    def _request(self, prompt: str, max_tokens: int, temperature: float, model: str,
+                 stream_callback: Optional[Callable[[str], None]] = None, system: Optional[str] = None) -> str:
+        """
+        Make one provider request, recording its token usage in last_usage.
         
-    def generate_executive_summary(self, analysis_data: Dict[str, Any]) -> str:
-        """Generate an executive summary of the bank branch analysis."""
+        Rate limits, server errors and connection failures are retried up to
+        three times with jittered exponential backoff (1s doubling, capped at 10s).
+        A streamed response is not retried once text has been passed to
+        stream_callback.
+        """
+        if self.provider == "openai":
+            # OpenAI caches repeated prompt prefixes automatically
+            messages = [{"role": "user", "content": prompt}]
+            if system:
+                messages.insert(0, {"role": "system", "content": system})
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature
+            )
+            if response.usage:
+                self.last_usage = {
+                    'model': model,
+                    'input_tokens': response.usage.prompt_tokens,
+                    'output_tokens': response.usage.completion_tokens
+                }
+            text = response.choices[0].message.content
+            if stream_callback:
+                stream_callback(text)
+            return text.strip()
+        elif self.provider == "claude":
+            request = {
+                'model': model,
+                'max_tokens': max_tokens,
+                'temperature': temperature,
+                'messages': [{"role": "user", "content": prompt}]
+            }
+            if system:
+                request['system'] = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+            chunks = []
+            try:
+                with self.client.messages.stream(**request) as stream:
+                    for chunk in stream.text_stream:
+                        chunks.append(chunk)
+                        if stream_callback:
+                            stream_callback(chunk)
+                    final = stream.get_final_message()
+            except Exception as e:
+                # A retry would stream the response again from the start, duplicating
+                # the text the callback already received, so only retry before that
+                if chunks and stream_callback:
+                    raise StreamInterruptedError(f"stream failed after {len(chunks)} chunks: {e}") from e
+                raise
+            self.last_usage = {
+                'model': model,
+                'input_tokens': final.usage.input_tokens,
+                'output_tokens': final.usage.output_tokens,
+                'cache_write_tokens': getattr(final.usage, 'cache_creation_input_tokens', 0) or 0,
+                'cache_read_tokens': getattr(final.usage, 'cache_read_input_tokens', 0) or 0
+            }
+            return "".join(chunks).strip()
+    
+    def _serialize_inputs(self, analysis_data: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Serialize the analysis inputs to JSON once so all section prompts can share them.
+        
+        The result is memoized for the most recent analysis_data, keyed on the
+        identity and length of each input, so refreshing a single section reuses
+        it. Replacing or resizing any of the inputs invalidates the memo.
+        """
+        inputs = ('trends', 'market_shares', 'bank_analysis', 'comparisons')
+        key = tuple((id(analysis_data.get(name)), len(analysis_data.get(name) or ())) for name in inputs)
+        with self._serialize_lock:
+            if self._serialized_source is analysis_data and self._serialized_key == key:
+                return self._serialized
+        
+        market_shares = analysis_data.get('market_shares', [])
+        years = analysis_data['years']
+        # Built in a local dict and published in one step under the lock, so a
+        # concurrent caller never sees one county's fields mixed with another's
+        serialized = {
+            'trends': to_json(analysis_data.get('trends', [])),
+            'top_banks': to_json(market_shares[:PROMPT_TOP_BANKS]),
+            'bank_analysis': to_json(analysis_data.get('bank_analysis', [])[:PROMPT_TOP_BANKS]),
+            'comparisons': to_json(analysis_data.get('comparisons', {}))
+        }
+        serialized['header'] = REPORT_HEADER_TMPL.format(
+            county=analysis_data['county'], first_year=years[0], last_year=years[-1]
+        )
+        serialized['context'] = REPORT_CONTEXT_TMPL.format(
+            county=analysis_data['county'], first_year=years[0], last_year=years[-1], top_n=PROMPT_TOP_BANKS,
+            trends_json=serialized['trends'], market_shares_json=serialized['top_banks'],
+            bank_analysis_json=serialized['bank_analysis'], comparisons_json=serialized['comparisons']
+        )
+        with self._serialize_lock:
+            # Holding a reference keeps the ids in the key from being reused
+            self._serialized = serialized
+            self._serialized_source = analysis_data
+            self._serialized_key = key
+        return serialized
+    
+    def _sections_key(self, analysis_data: Dict[str, Any]) -> str:
+        """
+        Section cache key covering the prompt inputs, prompt version and models used.
+        
+        The key hashes the serialized prompt context, which holds every input
+        the section prompts see, so the data is serialized once for both the
+        key and the prompts.
+        """
+        context = self._serialize_inputs(analysis_data)['context']
+        namespace = f"{PROMPT_VERSION}|{self.provider}|{self.model}|{FAST_MODEL}|{self.premium}|{AI_CONSOLIDATED_SECTIONS}"
+        return hashlib.sha256(f"{namespace}\n{context}".encode()).hexdigest()
+    
+    def generate_all(self, analysis_data: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Generate every narrative section of the report, serializing the input data only once.
+        
+        Sections generated earlier for identical input data are read back from
+        the on-disk section cache instead of calling the AI again.
+        """
+        key = self._sections_key(analysis_data)
+        cached = load_sections(key)
+        if all(cached.get(name) for name in REPORT_SECTION_KEYS):
+            return {name: cached[name] for name in REPORT_SECTION_KEYS}
+        
+        sections = None
+        if AI_CONSOLIDATED_SECTIONS:
+            sections = self.generate_report_sections(analysis_data)
+            if not sections:
+                print("Consolidated section request failed; generating sections individually")
+        if not sections:
+            sections = asyncio.run(self.generate_all_async(analysis_data))
+        
+        save_sections(key, sections)
+        return sections
+    
+    async def generate_all_async(self, analysis_data: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Generate the rendered narrative sections (REPORT_SECTION_KEYS) concurrently.
+        
+        Each section is an independent, network-bound request, so they run in
+        worker threads sharing the pooled provider client and the whole phase
+        takes about as long as the first section plus the slowest of the rest.
+        last_usage on the calling thread is not updated, since the calls run in workers.
+        """
+        serialized = self._serialize_inputs(analysis_data)
+        sections = {
+            'executive_summary': self.generate_executive_summary,
+            'overall_trends': self.analyze_overall_trends,
+            'key_findings': self.generate_key_findings
+        }
+        generators = list(sections.values())
+        # The first section writes the shared context to the provider's prompt
+        # cache; the rest start once it is there so they all read from it.
+        first = await asyncio.to_thread(generators[0], analysis_data, serialized)
+        rest = await asyncio.gather(
+            *(asyncio.to_thread(generate, analysis_data, serialized) for generate in generators[1:])
+        )
+        return dict(zip(sections, [first] + list(rest)))
+    
+    def generate_report_sections(self, analysis_data: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Generate the rendered narrative sections with a single JSON request.
+        
+        The input data and definitions are sent once instead of once per section.
+        If the response is not valid JSON with every expected field, the request
+        is repeated with the validation error appended to the prompt.
+        
+        Args:
+            analysis_data: Analysis results for one county (see generate_all)
+            
+        Returns:
+            Dict keyed by REPORT_SECTION_KEYS, or an empty dict if no valid response was received
+        """
         county = analysis_data['county']
         years = analysis_data['years']
+        
+        if not analysis_data['trends'] or not analysis_data['market_shares']:
+            return {}
+        
+        serialized = self._serialize_inputs(analysis_data)
+        prompt = REPORT_SECTIONS_TMPL.format(
+            county=county, first_year=years[0], last_year=years[-1], top_n=PROMPT_TOP_BANKS,
+            trends_json=serialized['trends'], market_shares_json=serialized['top_banks'],
+            bank_analysis_json=serialized['bank_analysis'], comparisons_json=serialized['comparisons']
+        )
+        model = self._select_model(prompt, county)
+        
+        request = prompt
+        for attempt in range(REPORT_SECTIONS_ATTEMPTS):
+            response = self._call_ai(request, max_tokens=3000, temperature=0.3, model=model)
+            if not response:
+                return {}
+            try:
+                start, end = response.find('{'), response.rfind('}')
+                if start == -1 or end < start:
+                    raise ValueError("no JSON object found")
+                data = orjson.loads(response[start:end + 1])
+                missing = [key for key in REPORT_SECTION_KEYS if not isinstance(data.get(key), str)]
+                if missing:
+                    raise ValueError(f"missing or non-string fields: {missing}")
+                return {key: data[key].strip() for key in REPORT_SECTION_KEYS}
+            except ValueError as e:
+                print(f"Invalid report sections response (attempt {attempt + 1}): {e}")
+                request = f"{prompt}\nYour previous response was invalid ({e}). Respond with ONLY the JSON object."
+        
+        return {}
+        
+    def generate_executive_summary(self, analysis_data: Dict[str, Any], serialized: Optional[Dict[str, str]] = None) -> str:
+        """Generate an executive summary of the bank branch analysis."""
+        county = analysis_data['county']
         trends = analysis_data['trends']
         market_shares = analysis_data['market_shares']
         
         if not trends or not market_shares:
             return ""
             
-        # Convert numpy types for JSON serialization
-        trends_json = convert_numpy_types(trends)
-        market_shares_json = convert_numpy_types(market_shares[:5])  # Top 5 banks only
+        if serialized is None:
+            serialized = self._serialize_inputs(analysis_data)
             
-        prompt = f"""
-        Generate a concise executive summary for bank branch analysis of {county} from {years[0]} to {years[-1]}:
-
-        Data: {json.dumps(trends_json, indent=2)} | {json.dumps(market_shares_json, indent=2)}
-
-        IMPORTANT DEFINITIONS:
-        - LMICT = Low-to-Moderate Income Census Tracts (areas with median family income below 80% of area median)
-        - MMCT = Majority-Minority Census Tracts (areas where minority populations represent more than 50% of total population)
-        - LMI/MMCT = Branches serving both low-to-moderate income and majority-minority communities
-
-        Focus on:
-        - Key trends in branch counts
-        - Market concentration among major banks
-        - MMCT percentage changes around 2022 (2020 census effect)
-        - 2-3 paragraphs maximum
-
-        Describe observable patterns without suggesting underlying causes.
-        """
+        prompt = EXEC_SUMMARY_TMPL.format(header=serialized['header'], top_n=PROMPT_TOP_BANKS)
+        context = serialized['context']
         
-        return self._call_ai(prompt, max_tokens=800, temperature=0.3)
+        return self._call_ai(prompt, max_tokens=400, temperature=0.3,
+                             model=self._select_model(context + prompt, county), system=context,
+                             section='executive_summary')
         
-    def generate_key_findings(self, analysis_data: Dict[str, Any]) -> str:
+    def generate_key_findings(self, analysis_data: Dict[str, Any], serialized: Optional[Dict[str, str]] = None) -> str:
         """Generate key findings from the analysis."""
         county = analysis_data['county']
-        years = analysis_data['years']
         trends = analysis_data['trends']
         market_shares = analysis_data['market_shares']
         
         if not trends or not market_shares:
             return ""
             
-        # Convert numpy types for JSON serialization
-        trends_json = convert_numpy_types(trends)
-        market_shares_json = convert_numpy_types(market_shares[:5])  # Top 5 banks only
+        if serialized is None:
+            serialized = self._serialize_inputs(analysis_data)
             
-        prompt = f"""
-        Generate 3-5 key findings for {county} analysis from {years[0]} to {years[-1]}:
-
-        Data: {json.dumps(trends_json, indent=2)} | {json.dumps(market_shares_json, indent=2)}
-
-        IMPORTANT DEFINITIONS:
-        - LMICT = Low-to-Moderate Income Census Tracts (areas with median family income below 80% of area median)
-        - MMCT = Majority-Minority Census Tracts (areas where minority populations represent more than 50% of total population)
-        - LMI/MMCT = Branches serving both low-to-moderate income and majority-minority communities
-
-        Focus on:
-        - Most significant trends and patterns
-        - MMCT changes around 2022 (2020 census effect)
-        - Actionable data observations
-        - Format as bullet points starting with "•"
-
-        Present factual patterns without speculating about strategic implications.
-        """
+        prompt = KEY_FINDINGS_TMPL.format(header=serialized['header'], top_n=PROMPT_TOP_BANKS)
+        context = serialized['context']
         
-        return self._call_ai(prompt, max_tokens=600, temperature=0.3)
+        return self._call_ai(prompt, max_tokens=600, temperature=0.3,
+                             model=self._select_model(context + prompt, county), system=context,
+                             section='key_findings')
         
-    def analyze_overall_trends(self, analysis_data: Dict[str, Any]) -> str:
+    def analyze_overall_trends(self, analysis_data: Dict[str, Any], serialized: Optional[Dict[str, str]] = None) -> str:
         """Analyze overall branch trends with enhanced context."""
         county = analysis_data['county']
-        years = analysis_data['years']
         trends = analysis_data['trends']
         
         if not trends:
             return ""
             
-        # Convert numpy types for JSON serialization
-        trends_json = convert_numpy_types(trends)
+        if serialized is None:
+            serialized = self._serialize_inputs(analysis_data)
             
-        prompt = f"""
-        Analyze overall branch trends for {county} from {years[0]} to {years[-1]}:
-
-        Data: {json.dumps(trends_json, indent=2)}
-
-        IMPORTANT DEFINITIONS:
-        - LMICT = Low-to-Moderate Income Census Tracts (areas with median family income below 80% of area median)
-        - MMCT = Majority-Minority Census Tracts (areas where minority populations represent more than 50% of total population)
-        - LMI/MMCT = Branches serving both low-to-moderate income and majority-minority communities
-
-        Focus on:
-        - Overall branch count trends and year-over-year changes
-        - MMCT percentage changes around 2022 (2020 census effect)
-        - Three categories: LMICT, MMCT, and LMI/MMCT
-        - Comparison to broader patterns where relevant
-        - 2-3 paragraphs maximum
-
-        Describe what the data demonstrates without attributing intent.
-        """
+        prompt = OVERALL_TRENDS_TMPL.format(header=serialized['header'], top_n=PROMPT_TOP_BANKS)
+        context = serialized['context']
         
-        return self._call_ai(prompt, max_tokens=800, temperature=0.3)
+        return self._call_ai(prompt, max_tokens=400, temperature=0.3,
+                             model=self._select_model(context + prompt, county), system=context,
+                             section='overall_trends')
 
-    def analyze_bank_strategies(self, analysis_data: Dict[str, Any]) -> str:
+    def analyze_bank_strategies(self, analysis_data: Dict[str, Any], serialized: Optional[Dict[str, str]] = None) -> str:
         """Analyze bank strategies and market concentration."""
         county = analysis_data['county']
-        years = analysis_data['years']
         market_shares = analysis_data['market_shares']
-        bank_analysis = analysis_data.get('bank_analysis', [])
         
         if not market_shares:
             return ""
             
-        # Convert numpy types for JSON serialization
-        market_shares_json = convert_numpy_types(market_shares[:10])  # Top 10 banks
-        bank_analysis_json = convert_numpy_types(bank_analysis)
+        if serialized is None:
+            serialized = self._serialize_inputs(analysis_data)
             
-        prompt = f"""
-        Analyze market concentration in {county} from {years[0]} to {years[-1]}:
-
-        Data: {json.dumps(market_shares_json, indent=2)} | {json.dumps(bank_analysis_json, indent=2)}
-
-        IMPORTANT DEFINITIONS:
-        - LMICT = Low-to-Moderate Income Census Tracts (areas with median family income below 80% of area median)
-        - MMCT = Majority-Minority Census Tracts (areas where minority populations represent more than 50% of total population)
-        - LMI/MMCT = Branches serving both low-to-moderate income and majority-minority communities
-
-        Focus on:
-        - Market concentration patterns among major banks
-        - Performance differences in serving LMICT, MMCT, and LMI/MMCT communities
-        - MMCT changes around 2022 (2020 census effect)
-        - Competitive dynamics observable in data
-        - 2-3 paragraphs maximum
-
-        Report measurable patterns without speculating about bank strategies.
-        """
+        prompt = BANK_STRATEGIES_TMPL.format(header=serialized['header'], top_n=PROMPT_TOP_BANKS)
+        context = serialized['context']
         
-        return self._call_ai(prompt, max_tokens=800, temperature=0.3)
+        return self._call_ai(prompt, max_tokens=400, temperature=0.3,
+                             model=self._select_model(context + prompt, county), system=context,
+                             section='bank_strategies')
 
-    def analyze_community_impact(self, analysis_data: Dict[str, Any]) -> str:
+    def analyze_community_impact(self, analysis_data: Dict[str, Any], serialized: Optional[Dict[str, str]] = None) -> str:
         """Analyze community impact and branch distribution."""
         county = analysis_data['county']
-        years = analysis_data['years']
         market_shares = analysis_data['market_shares']
-        comparisons = analysis_data.get('comparisons', {})
         
         if not market_shares:
             return ""
             
-        # Convert numpy types for JSON serialization
-        market_shares_json = convert_numpy_types(market_shares[:10])  # Top 10 banks
-        comparisons_json = convert_numpy_types(comparisons)
+        if serialized is None:
+            serialized = self._serialize_inputs(analysis_data)
             
-        prompt = f"""
-        Analyze community banking patterns in {county} from {years[0]} to {years[-1]}:
-
-        Data: {json.dumps(market_shares_json, indent=2)} | {json.dumps(comparisons_json, indent=2)}
-
-        IMPORTANT DEFINITIONS:
-        - LMICT = Low-to-Moderate Income Census Tracts (areas with median family income below 80% of area median)
-        - MMCT = Majority-Minority Census Tracts (areas where minority populations represent more than 50% of total population)
-        - LMI/MMCT = Branches serving both low-to-moderate income and majority-minority communities
-
-        Focus on:
-        - How banks serve different community types (LMICT, MMCT, LMI/MMCT)
-        - Bank performance compared to county averages
-        - 2020 census impact on MMCT designations (effective 2022)
-        - Observable access patterns in data
-        - 2-3 paragraphs maximum
-
-        Describe banking access patterns without inferring underlying causes.
-        """
+        prompt = COMMUNITY_IMPACT_TMPL.format(header=serialized['header'], top_n=PROMPT_TOP_BANKS)
+        context = serialized['context']
         
-        return self._call_ai(prompt, max_tokens=800, temperature=0.3)
+        return self._call_ai(prompt, max_tokens=400, temperature=0.3,
+                             model=self._select_model(context + prompt, county), system=context,
+                             section='community_impact')
 
-    def generate_conclusion(self, analysis_data: Dict[str, Any]) -> str:
+    def generate_conclusion(self, analysis_data: Dict[str, Any], serialized: Optional[Dict[str, str]] = None) -> str:
         """Generate a conclusion with strategic implications."""
         county = analysis_data['county']
-        years = analysis_data['years']
         trends = analysis_data['trends']
         market_shares = analysis_data['market_shares']
         
         if not trends or not market_shares:
             return ""
             
-        # Convert numpy types for JSON serialization
-        trends_json = convert_numpy_types(trends)
-        market_shares_json = convert_numpy_types(market_shares[:5])  # Top 5 banks
+        if serialized is None:
+            serialized = self._serialize_inputs(analysis_data)
             
-        prompt = f"""
-        Generate conclusion for {county} analysis from {years[0]} to {years[-1]}:
-
-        Data: {json.dumps(trends_json, indent=2)} | {json.dumps(market_shares_json, indent=2)}
-
-        IMPORTANT DEFINITIONS:
-        - LMICT = Low-to-Moderate Income Census Tracts (areas with median family income below 80% of area median)
-        - MMCT = Majority-Minority Census Tracts (areas where minority populations represent more than 50% of total population)
-        - LMI/MMCT = Branches serving both low-to-moderate income and majority-minority communities
-
-        Focus on:
-        - Key data patterns using proper formatting
-        - Three community categories (LMICT, MMCT, LMI/MMCT)
-        - 2020 census impact on MMCT data
-        - Observable trends and their measurable effects
-        - 2-3 paragraphs maximum
-
-        Synthesize key data insights without making policy suggestions.
-        """
+        prompt = CONCLUSION_TMPL.format(header=serialized['header'], top_n=PROMPT_TOP_BANKS)
+        context = serialized['context']
         
-        return self._call_ai(prompt, max_tokens=800, temperature=0.3)
+        return self._call_ai(prompt, max_tokens=400, temperature=0.3,
+                             model=self._select_model(context + prompt, county), system=context,
+                             section='conclusion')
 
 
 # Legacy class name for backward compatibility
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+On-disk cache of generated report sections.
+
+Each entry is a JSON file mapping section names to their text, named by a key
+the caller derives from everything the sections depend on (input data, prompt
+version and model), so re-running a report with unchanged inputs skips the AI.
+Entries expire after AI_SECTION_CACHE_TTL_HOURS, and only the newest
+AI_SECTION_CACHE_MAX_ENTRIES are kept.
+"""
+
+import os
+import json
+import time
+from typing import Dict
+from config import (AI_SECTION_CACHE_ENABLED, AI_SECTION_CACHE_DIR, AI_SECTION_CACHE_TTL_HOURS,
+                    AI_SECTION_CACHE_MAX_ENTRIES)
+
+
+def load_sections(key: str) -> Dict[str, str]:
+    """Return previously generated sections stored under key, or an empty dict."""
+    path = os.path.join(AI_SECTION_CACHE_DIR, f"{key}.json")
+    if not AI_SECTION_CACHE_ENABLED or not os.path.exists(path):
+        return {}
+    if time.time() - os.path.getmtime(path) > AI_SECTION_CACHE_TTL_HOURS * 3600:
+        return {}
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: ignoring unreadable AI section cache {path}: {e}")
+        return {}
+
+
+def save_sections(key: str, sections: Dict[str, str]):
+    """Persist the non-empty sections under key; failed (empty) sections are regenerated next time."""
+    if not AI_SECTION_CACHE_ENABLED:
+        return
+    os.makedirs(AI_SECTION_CACHE_DIR, exist_ok=True)
+    with open(os.path.join(AI_SECTION_CACHE_DIR, f"{key}.json"), 'w') as f:
+        json.dump({name: text for name, text in sections.items() if text}, f, indent=2)
+    _evict()
+
+
+def _evict():
+    """Delete expired entries and, beyond AI_SECTION_CACHE_MAX_ENTRIES, the oldest ones."""
+    entries = []
+    with os.scandir(AI_SECTION_CACHE_DIR) as it:
+        for entry in it:
+            if entry.name.endswith('.json'):
+                entries.append((entry.stat().st_mtime, entry.path))
+    entries.sort(reverse=True)
+    cutoff = time.time() - AI_SECTION_CACHE_TTL_HOURS * 3600
+    for rank, (mtime, path) in enumerate(entries):
+        if rank >= AI_SECTION_CACHE_MAX_ENTRIES or mtime < cutoff:
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # Removed concurrently by another report
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Semantic cache for AI responses.
+
+Every response is stored under the SHA-256 of its canonicalized prompt, so
+repeating a prompt exactly is answered from an in-memory dict. Otherwise the
+prompt is embedded with a small local sentence-transformers model and looked
+up in a FAISS index; a near-identical prompt (cosine similarity above the
+configured threshold) returns the stored response without calling the API.
+Entries are only matched within the same namespace (prompt version, provider,
+model, sampling settings, section and a hash of the exact data block), so only
+the wording of the instruction is matched by similarity; another section's or
+another county's response is never served.
+
+The FAISS index is written to disk every _PERSIST_EVERY stores and when the
+process exits. If on load it doesn't hold exactly one row per embedded entry
+of the JSONL sidecar (e.g. after a crash), it is rebuilt from the prompts
+stored there.
+"""
+
+import os
+import re
+import json
+import time
+import atexit
+import hashlib
+import threading
+from typing import Optional
+from config import SEMANTIC_CACHE_DIR, SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_MODEL
+
+# Number of nearest neighbours to inspect when looking for a same-namespace hit
+_SEARCH_K = 5
+
+# New entries added before the FAISS index is rewritten on disk
+_PERSIST_EVERY = 20
+
+
+def _prompt_hash(prompt: str, namespace: str) -> str:
+    """SHA-256 of the namespace and the prompt with whitespace runs collapsed."""
+    canonical = re.sub(r'\s+', ' ', prompt).strip()
+    return hashlib.sha256(f"{namespace}\n{canonical}".encode('utf-8')).hexdigest()
+
+
+class SemanticLLMCache:
+    """Response cache persisted as a JSONL file of entries plus a FAISS index of their embeddings."""
+
+    def __init__(self, cache_dir: str = SEMANTIC_CACHE_DIR, threshold: float = SEMANTIC_CACHE_THRESHOLD,
+                 model_name: str = SEMANTIC_CACHE_MODEL):
+        """
+        Load any previously saved cache entries and, if available, the embedding model.
+
+        Without sentence-transformers and faiss-cpu only exact matches are served.
+
+        Args:
+            cache_dir: Directory holding the FAISS index and the JSONL sidecar
+            threshold: Minimum cosine similarity for a prompt to count as a hit
+            model_name: sentence-transformers model used to embed prompts
+        """
+        self.threshold = threshold
+        # Sections may be generated concurrently; guards the index, the entry maps and the sidecar
+        self._lock = threading.Lock()
+        # Entries added to the index since it was last written to disk
+        self._unsaved = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index_path = os.path.join(cache_dir, 'prompts.faiss')
+        self.entries_path = os.path.join(cache_dir, 'responses.jsonl')
+
+        # Each entry records its hash, namespace, response and the row of its
+        # embedding in the FAISS index (None if it was stored without one)
+        self.entries = []
+        if os.path.exists(self.entries_path):
+            with open(self.entries_path, 'r') as f:
+                self.entries = [json.loads(line) for line in f if line.strip()]
+        self.by_hash = {entry['sha']: entry for entry in self.entries if 'sha' in entry}
+
+        try:
+            import faiss
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            print("Warning: sentence-transformers and faiss-cpu not found; the AI cache will only serve exact matches.")
+            self.encoder = None
+            self.index = None
+            return
+
+        self.faiss = faiss
+        self.encoder = SentenceTransformer(model_name)
+        embedded = [entry for entry in self.entries if entry.get('row') is not None]
+        self.index = faiss.read_index(self.index_path) if os.path.exists(self.index_path) else None
+        if self.index is None or self.index.ntotal != len(embedded):
+            self._rebuild_index()
+        self.by_row = {entry['row']: entry for entry in self.entries if entry.get('row') is not None}
+
+    def _rebuild_index(self):
+        """Re-embed the prompts stored in the sidecar, renumbering their rows to match the new index."""
+        self.index = self.faiss.IndexFlatIP(self.encoder.get_sentence_embedding_dimension())
+        for entry in self.entries:
+            entry['row'] = None
+            if entry.get('prompt'):
+                entry['row'] = self.index.ntotal
+                self.index.add(self._embed(entry['prompt']))
+        with open(self.entries_path, 'w') as f:
+            f.writelines(json.dumps(entry) + '\n' for entry in self.entries)
+        self.faiss.write_index(self.index, self.index_path)
+
+    def flush(self):
+        """Write the FAISS index to disk if entries were added since it was last saved."""
+        if self.index is None:
+            return
+        with self._lock:
+            if self._unsaved:
+                self.faiss.write_index(self.index, self.index_path)
+                self._unsaved = 0
+
+    def _embed(self, prompt: str):
+        """Embed a prompt as a normalized float32 row vector (inner product == cosine)."""
+        return self.encoder.encode([prompt], normalize_embeddings=True).astype('float32')
+
+    def lookup(self, prompt: str, namespace: str) -> Optional[str]:
+        """Return the cached response for an identical or near-identical prompt, or None."""
+        entry = self.by_hash.get(_prompt_hash(prompt, namespace))
+        if entry:
+            return entry['response']
+
+        if self.index is None:
+            return None
+
+        embedding = self._embed(prompt)
+        with self._lock:
+            if self.index.ntotal == 0:
+                return None
+            scores, rows = self.index.search(embedding, min(_SEARCH_K, self.index.ntotal))
+            for score, row in zip(scores[0], rows[0]):
+                if row < 0 or score < self.threshold:
+                    break
+                entry = self.by_row.get(int(row))
+                if entry and entry['namespace'] == namespace:
+                    return entry['response']
+        return None
+
+    def store(self, prompt: str, namespace: str, response: str, provider: str = None, model: str = None):
+        """Add a prompt/response pair to the cache and persist it."""
+        entry = {
+            'sha': _prompt_hash(prompt, namespace),
+            'namespace': namespace,
+            'provider': provider,
+            'model': model,
+            'timestamp': time.time(),
+            'row': None,
+            'prompt': prompt,
+            'response': response
+        }
+        embedding = self._embed(prompt) if self.index is not None else None
+
+        with self._lock:
+            if embedding is not None:
+                entry['row'] = self.index.ntotal
+                self.index.add(embedding)
+                self.by_row[entry['row']] = entry
+                self._unsaved += 1
+                if self._unsaved >= _PERSIST_EVERY:
+                    self.faiss.write_index(self.index, self.index_path)
+                    self._unsaved = 0
+
+            self.entries.append(entry)
+            self.by_hash[entry['sha']] = entry
+            with open(self.entries_path, 'a') as f:
+                f.write(json.dumps(entry) + '\n')
+
+
+# Shared cache instance, created on first use by get_semantic_cache()
+_cache = None
+
+def get_semantic_cache() -> SemanticLLMCache:
+    """
+    Return the shared semantic cache.
+
+    Loading the embedding model takes a moment, so it is only done once per process.
+    """
+    global _cache
+    if _cache is None:
+        _cache = SemanticLLMCache()
+        # Save any index rows added since the last periodic write
+        atexit.register(_cache.flush)
+    return _cache
@@ -6,27 +6,47 @@ Main orchestration script for the complete workflow.
 
 import sys
 import os
+import json
+import time
+import shutil
+import hashlib
+import difflib
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Tuple, Optional
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 
-# Add the src directory to the Python path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-
-from utils.bq_utils import execute_query, find_exact_county_match
-from analysis.gpt_utils import AIAnalyzer, ask_gpt, extract_parameters
-from reporting.pdf_report_generator import generate_pdf_report_from_data
-from reporting.report_builder import build_report, save_excel_report
-
 # Import configuration
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'config'))
 from config import *
 
-from config import PROMPT_PATH, SQL_TEMPLATE_PATH, OUTPUT_DIR
-
-
+from config import (PROMPT_PATH, SQL_BATCH_TEMPLATE_PATH, OUTPUT_DIR, REPORT_CACHE_ENABLED, REPORT_CACHE_DIR,
+                    REPORT_CACHE_TTL_HOURS, AI_PROVIDER)
+
+# Everything is imported through the src package, so each module (and its
+# shared clients and caches) is loaded only once
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from src.utils.bq_utils import (execute_query_batch, find_exact_county_match, find_exact_county_matches,
+                                get_available_counties, match_counties, table_fingerprint)
+from src.analysis.gpt_utils import (AIAnalyzer, ask_gpt, extract_parameters, PROMPT_VERSION, AI_MODEL,
+                                    FAST_MODEL)
+from src.reporting.pdf_report_generator import generate_pdf_report_from_data
+from src.reporting.report_builder import build_report, save_excel_report, percentage
+from src.utils.bq_tracker import TrackedBigQueryClient
+from src.analysis.ai_tracker import TrackedAIAnalyzer
+from src.utils.run_logger import run_logger
+
+# Optional: only used by the CLI to set up credentials for BigQuery run logging
+try:
+    from scripts.setup_gcp_credentials import setup_environment
+except ImportError:
+    setup_environment = None
+
+
+@lru_cache(maxsize=1)
 def load_prompt() -> str:
-    """Load the natural language prompt from file."""
+    """Load the natural language prompt from file (read once per process)."""
     try:
         with open(PROMPT_PATH, 'r') as f:
             return f.read().strip()
@@ -35,24 +55,37 @@ def load_prompt() -> str:
         sys.exit(1)
 
 
+@lru_cache(maxsize=1)
 def load_sql_template() -> str:
-    """Load the SQL query template from file."""
+    """Load the batch SQL query template (all counties and years in one query) from file (read once per process)."""
     try:
-        with open(SQL_TEMPLATE_PATH, 'r') as f:
+        with open(SQL_BATCH_TEMPLATE_PATH, 'r') as f:
             return f.read().strip()
     except FileNotFoundError:
-        print(f"Error: SQL template file not found at {SQL_TEMPLATE_PATH}")
+        print(f"Error: SQL template file not found at {SQL_BATCH_TEMPLATE_PATH}")
         sys.exit(1)
 
 
-def select_county_interactively(user_county: str) -> str:
-    """Prompt the user to clarify or select the correct county if ambiguous."""
-    matches = find_exact_county_match(user_county)
-    if not matches:
+def select_county_interactively(user_county: str, all_counties: List[str] = None) -> str:
+    """
+    Prompt the user to clarify or select the correct county if ambiguous.
+    
+    Matching runs in memory against all_counties (fetched once if not given),
+    so re-entering a misspelled county doesn't query BigQuery again.
+    """
+    if all_counties is None:
+        all_counties = get_available_counties()
+    
+    matches = match_counties(user_county, all_counties)
+    while not matches:
         print(f"❌ No counties found matching '{user_county}'. Please check the spelling or use the county_reference.py script to find the exact name.")
-        new_county = input(f"Enter the exact county name (e.g., 'Cook County, Illinois'): ").strip()
-        return select_county_interactively(new_county)
-    elif len(matches) == 1:
+        suggestions = difflib.get_close_matches(user_county, all_counties, n=5, cutoff=0.6)
+        if suggestions:
+            print(f"   Did you mean: {'; '.join(suggestions)}")
+        user_county = input(f"Enter the exact county name (e.g., 'Cook County, Illinois'): ").strip()
+        matches = match_counties(user_county, all_counties)
+    
+    if len(matches) == 1:
         print(f"✅ Using county: {matches[0]}")
         return matches[0]
     else:
@@ -70,9 +103,18 @@ def select_county_interactively(user_county: str) -> str:
             print("Invalid selection. Please enter a valid number.")
 
 
-def select_county_automatically(user_county: str) -> str:
+def select_counties_interactively(user_counties: List[str]) -> List[str]:
+    """Clarify several counties, fetching the county list from BigQuery only once."""
+    all_counties = get_available_counties()
+    clarified = [select_county_interactively(county, all_counties) for county in user_counties]
+    # Different spellings can resolve to the same county; keep the first occurrence of each
+    return list(dict.fromkeys(clarified))
+
+
+def select_county_automatically(user_county: str, matches: List[str] = None) -> str:
     """Automatically select the best county match without user interaction."""
-    matches = find_exact_county_match(user_county)
+    if matches is None:
+        matches = find_exact_county_match(user_county)
     if not matches:
         raise ValueError(f"No counties found matching '{user_county}'. Please check the spelling.")
     elif len(matches) == 1:
@@ -93,7 +135,7 @@ def get_user_parameters():
     if years_input.lower() == "all":
         years = list(range(2017, 2025))
     else:
-        years = [int(y.strip()) for y in years_input.split(",") if y.strip().isdigit()]
+        years = list(dict.fromkeys(int(y.strip()) for y in years_input.split(",") if y.strip().isdigit()))
 
     return counties, years
 
@@ -105,31 +147,96 @@ def parse_web_parameters(counties_str: str, years_str: str) -> tuple:
     if years_str.lower() == "all":
         years = list(range(2017, 2025))
     else:
-        years = [int(y.strip()) for y in years_str.split(",") if y.strip().isdigit()]
+        years = list(dict.fromkeys(int(y.strip()) for y in years_str.split(",") if y.strip().isdigit()))
     
     return counties, years
 
 
 def prepare_data_for_pdf(raw_data: pd.DataFrame) -> pd.DataFrame:
-    """Prepare the raw data for PDF generation by adding required percentage fields."""
+    """
+    Prepare the raw data for PDF generation by adding required percentage fields.
+    
+    Returns a new DataFrame; the caller's raw_data is never modified. A
+    shallow copy is taken once and every column is replaced rather than
+    written in place, so no column data is copied up front.
+    """
     # Convert to DataFrame if it's not already
-    if not isinstance(raw_data, pd.DataFrame):
-        raw_data = pd.DataFrame(raw_data)
+    if isinstance(raw_data, pd.DataFrame):
+        df = raw_data.copy(deep=False)
+    else:
+        df = pd.DataFrame(raw_data)
     
     # Ensure numeric columns
     numeric_columns = ['total_branches', 'lmict', 'mmct']
-    for col in numeric_columns:
-        raw_data[col] = pd.to_numeric(raw_data[col], errors='coerce').fillna(0)
+    numeric = df[numeric_columns]
+    text_columns = [col for col in numeric_columns if not pd.api.types.is_numeric_dtype(numeric[col])]
+    if text_columns:
+        numeric = numeric.assign(**{col: pd.to_numeric(numeric[col], errors='coerce') for col in text_columns})
+    numeric = numeric.to_numpy(dtype='float64', na_value=0)
+    total_branches, lmict, mmct = numeric.T
+    df['total_branches'] = total_branches
+    df['lmict'] = lmict
+    df['mmct'] = mmct
+    
+    # Calculate percentage fields that the PDF generator expects, using 0 where a row has no branches
+    df['lmict_pct'] = percentage(lmict, total_branches, decimals=2)
+    df['mmct_pct'] = percentage(mmct, total_branches, decimals=2)
+    
+    return df
+
+
+def report_cache_key(clarified_counties: List[str], years: List[int]) -> Optional[str]:
+    """
+    Key identifying a finished report by its counties, years, AI prompt and model, and source data.
     
-    # Calculate percentage fields that the PDF generator expects
-    raw_data['lmict_pct'] = (raw_data['lmict'] / raw_data['total_branches'] * 100).round(2)
-    raw_data['mmct_pct'] = (raw_data['mmct'] / raw_data['total_branches'] * 100).round(2)
+    Returns:
+        The key, or None if caching is disabled or the source tables can't be fingerprinted
+    """
+    if not REPORT_CACHE_ENABLED:
+        return None
+    try:
+        data_version = table_fingerprint()
+    except Exception as e:
+        print(f"Warning: could not read the source table versions, not using the report cache: {e}")
+        return None
+    key = (sorted(clarified_counties), sorted(years), PROMPT_VERSION, AI_PROVIDER, AI_MODEL, FAST_MODEL, data_version)
+    return hashlib.sha256(repr(key).encode()).hexdigest()
+
+
+def restore_cached_report(cache_key: str, excel_path: str, pdf_path: str) -> Optional[Dict]:
+    """
+    Copy a cached report to the given output paths if one exists and is recent enough.
     
-    # Handle division by zero
-    raw_data['lmict_pct'] = raw_data['lmict_pct'].fillna(0)
-    raw_data['mmct_pct'] = raw_data['mmct_pct'].fillna(0)
+    Returns:
+        The cached report's metadata, or None if there is no usable cached report
+    """
+    if not REPORT_CACHE_ENABLED or cache_key is None:
+        return None
+    base = os.path.join(REPORT_CACHE_DIR, cache_key)
+    paths = [f"{base}.xlsx", f"{base}.pdf", f"{base}.json"]
+    if not all(os.path.exists(path) for path in paths):
+        return None
+    if time.time() - os.path.getmtime(f"{base}.json") > REPORT_CACHE_TTL_HOURS * 3600:
+        return None
     
-    return raw_data
+    with open(f"{base}.json", 'r') as f:
+        metadata = json.load(f)
+    shutil.copyfile(f"{base}.xlsx", excel_path)
+    shutil.copyfile(f"{base}.pdf", pdf_path)
+    return metadata
+
+
+def store_cached_report(cache_key: str, excel_path: str, pdf_path: str, records: int):
+    """Save a finished report so later runs with the same parameters can reuse it."""
+    if not REPORT_CACHE_ENABLED or cache_key is None:
+        return
+    os.makedirs(REPORT_CACHE_DIR, exist_ok=True)
+    base = os.path.join(REPORT_CACHE_DIR, cache_key)
+    shutil.copyfile(excel_path, f"{base}.xlsx")
+    shutil.copyfile(pdf_path, f"{base}.pdf")
+    # Written last: its presence marks the cached report as complete
+    with open(f"{base}.json", 'w') as f:
+        json.dump({'records': records}, f)
 
 
 def run_analysis(counties_str: str, years_str: str, run_id: str = None, progress_tracker=None) -> Dict:
@@ -155,52 +262,59 @@ def run_analysis(counties_str: str, years_str: str, run_id: str = None, progress
         if progress_tracker:
             progress_tracker.update_progress('clarifying_counties')
         
+        county_matches = find_exact_county_matches(counties)
         clarified_counties = []
         for county in counties:
             try:
-                clarified_county = select_county_automatically(county)
+                clarified_county = select_county_automatically(county, county_matches[county])
                 clarified_counties.append(clarified_county)
             except ValueError as e:
                 return {'success': False, 'error': str(e)}
+        # Different spellings can resolve to the same county; keep the first occurrence of each
+        clarified_counties = list(dict.fromkeys(clarified_counties))
+        
+        # Reuse a recent report for the same counties, years, AI model and data
+        excel_path = os.path.join(OUTPUT_DIR, 'fdic_branch_analysis.xlsx')
+        pdf_path = os.path.join(OUTPUT_DIR, 'fdic_branch_analysis.pdf')
+        cache_key = report_cache_key(clarified_counties, years)
+        cached = restore_cached_report(cache_key, excel_path, pdf_path)
+        if cached:
+            if run_id:
+                run_logger.update_run(run_id, excel_file=excel_path, pdf_file=pdf_path)
+            if progress_tracker:
+                progress_tracker.complete(success=True)
+            return {
+                'success': True,
+                'message': f'Reused the cached report for {len(clarified_counties)} counties and {len(years)} years.',
+                'counties': clarified_counties,
+                'years': years,
+                'records': cached.get('records')
+            }
         
         # Execute BigQuery queries with tracking if run_id provided
         if progress_tracker:
             progress_tracker.update_progress('connecting_bq')
         
         sql_template = load_sql_template()
-        all_results = []
         
         if run_id:
             # Use tracked BigQuery client
-            from src.utils.bq_tracker import TrackedBigQueryClient
             bq_client = TrackedBigQueryClient(run_id, progress_tracker)
             
-            # Calculate total queries for progress tracking
-            total_queries = len(clarified_counties) * len(years)
-            query_index = 0
-            
-            for county in clarified_counties:
-                for year in years:
-                    try:
-                        results = bq_client.execute_query(sql_template, county, year, query_index, total_queries)
-                        all_results.extend(results)
-                        query_index += 1
-                    except Exception as e:
-                        print(f"Error querying {county} {year}: {e}")
-                        query_index += 1
-                        continue
+            try:
+                all_results = bq_client.execute_query_batch(sql_template, clarified_counties, years)
+            except Exception as e:
+                print(f"Error querying {clarified_counties} {years}: {e}")
+                all_results = pd.DataFrame()
         else:
             # Use regular BigQuery client
-            for county in clarified_counties:
-                for year in years:
-                    try:
-                        results = execute_query(sql_template, county, year)
-                        all_results.extend(results)
-                    except Exception as e:
-                        print(f"Error querying {county} {year}: {e}")
-                        continue
+            try:
+                all_results = execute_query_batch(sql_template, clarified_counties, years)
+            except Exception as e:
+                print(f"Error querying {clarified_counties} {years}: {e}")
+                all_results = pd.DataFrame()
         
-        if not all_results:
+        if all_results.empty:
             return {'success': False, 'error': 'No data found for the specified parameters'}
         
         # Build and save report
@@ -210,12 +324,10 @@ def run_analysis(counties_str: str, years_str: str, run_id: str = None, progress
         report_data = build_report(all_results, clarified_counties, years)
         
         # Save Excel report with standard filename
-        excel_path = os.path.join(OUTPUT_DIR, 'fdic_branch_analysis.xlsx')
         save_excel_report(report_data, excel_path)
         
         # Update run metadata with file paths
         if run_id:
-            from src.utils.run_logger import run_logger
             run_logger.update_run(run_id, excel_file=excel_path)
         
         # Prepare data for PDF generation
@@ -224,43 +336,14 @@ def run_analysis(counties_str: str, years_str: str, run_id: str = None, progress
         
         pdf_data = prepare_data_for_pdf(report_data['raw_data'])
         
-        # Generate PDF report with AI analysis if run_id provided
-        pdf_path = os.path.join(OUTPUT_DIR, 'fdic_branch_analysis.pdf')
-        
+        # Generate PDF report; with a run_id its AI sections are generated by a tracked analyzer
         if run_id:
-            # Use tracked AI analyzer
-            from src.analysis.ai_tracker import TrackedAIAnalyzer
-            ai_analyzer = TrackedAIAnalyzer(run_id, progress_tracker)
-            
-            # Create data dictionary with DataFrame and metadata for AI analysis
-            ai_data = {
-                'data': pdf_data,
-                'counties': clarified_counties,
-                'years': years,
-                'total_branches': len(pdf_data),
-                'top_banks': pdf_data['bank_name'].value_counts().head(5).index.tolist() if 'bank_name' in pdf_data.columns else []
-            }
-            
-            # Generate AI analysis sections
             if progress_tracker:
                 progress_tracker.update_progress('generating_ai')
             
-            ai_sections = {
-                'executive_summary': ai_analyzer.generate_executive_summary(ai_data),
-                'key_findings': ai_analyzer.generate_key_findings(ai_data),
-                'trends_analysis': ai_analyzer.generate_trends_analysis(ai_data),
-                'bank_strategies': ai_analyzer.generate_bank_strategies_analysis(ai_data),
-                'community_impact': ai_analyzer.generate_community_impact_analysis(ai_data),
-                'conclusion': ai_analyzer.generate_conclusion(ai_data)
-            }
-            
-            # Generate PDF with AI analysis
-            if progress_tracker:
-                progress_tracker.update_progress('creating_pdf')
-            
-            generate_pdf_report_from_data(pdf_data, clarified_counties, years, pdf_path, ai_sections)
+            ai_analyzer = TrackedAIAnalyzer(run_id, progress_tracker)
+            ai_complete = generate_pdf_report_from_data(pdf_data, clarified_counties, years, pdf_path, ai_analyzer)
         else:
-            # Generate PDF without AI analysis
             if progress_tracker:
                 progress_tracker.update_progress('creating_pdf')
             
@@ -269,6 +352,9 @@ def run_analysis(counties_str: str, years_str: str, run_id: str = None, progress
         # Update run metadata with PDF file path
         if run_id:
             run_logger.update_run(run_id, pdf_file=pdf_path)
+            # Only reports whose sections all came from the AI are cached, so a cache hit is always a full report
+            if ai_complete:
+                store_cached_report(cache_key, excel_path, pdf_path, len(all_results))
         
         # Mark as completed
         if progress_tracker:
@@ -299,14 +385,12 @@ def main():
     print(f"Years: {years}")
 
     # Set up Google Cloud credentials for BigQuery logging
-    try:
-        from scripts.setup_gcp_credentials import setup_environment
+    if setup_environment:
         setup_environment()
-    except ImportError:
+    else:
         print("Warning: Could not set up GCP credentials for logging")
     
     # Start run logging for CLI
-    from src.utils.run_logger import run_logger
     run_id = run_logger.start_run(
         counties=counties,
         years=years,
@@ -316,34 +400,43 @@ def main():
     try:
         # Step 2: Clarify county selections once
         print("\n🔍 Step 2: Clarifying county selections...")
-        clarified_counties = []
-        for county in counties:
-            clarified_county = select_county_interactively(county)
-            clarified_counties.append(clarified_county)
+        clarified_counties = select_counties_interactively(counties)
         
         print(f"Clarified counties: {clarified_counties}")
+        
+        # Generate filenames with timestamp
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        counties_str = "_".join(clarified_counties).replace(" ", "_").replace(",", "")
+        years_str = "_".join(map(str, years))
+        filename = f"fdic_branch_report_{counties_str}_{years_str}_{timestamp}.xlsx"
+        output_path = os.path.join(OUTPUT_DIR, filename)
+        pdf_output_path = output_path.replace('.xlsx', '.pdf')
+        
+        # Reuse a recent report for the same counties, years, AI model and data
+        cache_key = report_cache_key(clarified_counties, years)
+        if restore_cached_report(cache_key, output_path, pdf_output_path):
+            print(f"✅ Reused cached report: {output_path}")
+            print(f"✅ Reused cached PDF report: {pdf_output_path}")
+            run_logger.update_run(run_id, excel_file=output_path, pdf_file=pdf_output_path)
+            run_logger.end_run(run_id, success=True)
+            return
 
-        # Step 3: Execute BigQuery for each county/year combination
+        # Step 3: Execute one BigQuery query for all county/year combinations
         print("\n🔍 Step 3: Executing BigQuery queries...")
         sql_template = load_sql_template()
-        all_results = []
         
         # Use tracked BigQuery client
-        from src.utils.bq_tracker import TrackedBigQueryClient
         bq_client = TrackedBigQueryClient(run_id)
         
-        for county in clarified_counties:
-            for year in years:
-                print(f"  Querying {county} for year {year}...")
-                try:
-                    results = bq_client.execute_query(sql_template, county, year)
-                    all_results.extend(results)
-                    print(f"    Found {len(results)} records")
-                except Exception as e:
-                    print(f"    Error querying {county} {year}: {e}")
-                    continue
-
-        if not all_results:
+        print(f"  Querying {len(clarified_counties)} counties for {len(years)} years in one query...")
+        try:
+            all_results = bq_client.execute_query_batch(sql_template, clarified_counties, years)
+            print(f"    Found {len(all_results)} records")
+        except Exception as e:
+            print(f"    Error querying {clarified_counties} {years}: {e}")
+            all_results = pd.DataFrame()
+
+        if all_results.empty:
             print("❌ No data found for the specified parameters")
             run_logger.end_run(run_id, success=False, error_message="No data found for the specified parameters")
             sys.exit(1)
@@ -353,55 +446,26 @@ def main():
         try:
             report_data = build_report(all_results, clarified_counties, years)
             
-            # Generate filename with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            counties_str = "_".join(clarified_counties).replace(" ", "_").replace(",", "")
-            years_str = "_".join(map(str, years))
-            filename = f"fdic_branch_report_{counties_str}_{years_str}_{timestamp}.xlsx"
-            
-            output_path = os.path.join(OUTPUT_DIR, filename)
-            save_excel_report(report_data, output_path)
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                # The Excel file doesn't depend on the AI sections, so write it while the PDF is generated
+                excel_future = executor.submit(save_excel_report, report_data, output_path)
+                
+                # Prepare data for PDF generation (returns a new frame, so the Excel writer's raw_data is untouched)
+                pdf_data = prepare_data_for_pdf(report_data['raw_data'])
+                
+                # PDF report generation with AI analysis, tracked under this run
+                print(f"\n📝 Generating PDF report...")
+                ai_analyzer = TrackedAIAnalyzer(run_id)
+                ai_complete = generate_pdf_report_from_data(pdf_data, clarified_counties, years, pdf_output_path, ai_analyzer)
+                
+                excel_future.result()
             print(f"✅ Report saved successfully: {output_path}")
-            
-            # Update run metadata with Excel file path
-            run_logger.update_run(run_id, excel_file=output_path)
-            
-            # Prepare data for PDF generation
-            pdf_data = prepare_data_for_pdf(report_data['raw_data'])
-            
-            # PDF report generation with AI analysis
-            pdf_output_path = output_path.replace('.xlsx', '.pdf')
-            print(f"\n📝 Generating PDF report...")
-            
-            # Use tracked AI analyzer
-            from src.analysis.ai_tracker import TrackedAIAnalyzer
-            ai_analyzer = TrackedAIAnalyzer(run_id)
-            
-            # Create data dictionary with DataFrame and metadata for AI analysis
-            ai_data = {
-                'data': pdf_data,
-                'counties': clarified_counties,
-                'years': years,
-                'total_branches': len(pdf_data),
-                'top_banks': pdf_data['bank_name'].value_counts().head(5).index.tolist() if 'bank_name' in pdf_data.columns else []
-            }
-            
-            # Generate AI analysis sections
-            ai_sections = {
-                'executive_summary': ai_analyzer.generate_executive_summary(ai_data),
-                'key_findings': ai_analyzer.generate_key_findings(ai_data),
-                'trends_analysis': ai_analyzer.generate_trends_analysis(ai_data),
-                'bank_strategies': ai_analyzer.generate_bank_strategies_analysis(ai_data),
-                'community_impact': ai_analyzer.generate_community_impact_analysis(ai_data),
-                'conclusion': ai_analyzer.generate_conclusion(ai_data)
-            }
-            
-            # Generate PDF with AI analysis
-            generate_pdf_report_from_data(pdf_data, clarified_counties, years, pdf_output_path, ai_sections)
             print(f"✅ PDF report saved successfully: {pdf_output_path}")
             
-            # Update run metadata with PDF file path
-            run_logger.update_run(run_id, pdf_file=pdf_output_path)
+            # Update run metadata with the Excel and PDF file paths
+            run_logger.update_run(run_id, excel_file=output_path, pdf_file=pdf_output_path)
+            if ai_complete:
+                store_cached_report(cache_key, output_path, pdf_output_path, len(all_results))
             
             # End the run successfully
             run_logger.end_run(run_id, success=True)
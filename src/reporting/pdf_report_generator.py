@@ -8,8 +8,6 @@ import numpy as np
 import pandas as pd
 from datetime import datetime
 from typing import Dict, List, Tuple
-import matplotlib.pyplot as plt
-import seaborn as sns
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.platypus import (SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Image, 
                                 BaseDocTemplate, PageTemplate, Frame, KeepTogether)
@@ -20,11 +18,306 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT, TA_JUSTIFY
 import os
 import json
 import re
-from src.analysis.gpt_utils import AIAnalyzer
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from src.analysis.gpt_utils import AIAnalyzer, PROMPT_TOP_BANKS
+from config import AI_PROVIDER
+from src.reporting.report_builder import percentage
+
+# Patterns used to format AI-generated text, compiled once
+_SECTION_SPLIT_RE = re.compile(r'\n\s*\n')
+_NUMBERED_RE = re.compile(r'^\d+\.')
+_BULLET_STRIP_RE = re.compile(r'^[•\-*]\s*')
+# Short all-caps or title-case phrase ending in a colon, e.g. "KEY TRENDS:" or "Overview:"
+_HEADING_RE = re.compile(r'^[A-Z](?:[A-Z\s]{2,10}|[a-z\s]{2,15}):$')
+_BOLD_DOUBLE_RE = re.compile(r'\*\*(.*?)\*\*')
+_BOLD_SINGLE_RE = re.compile(r'(?<!\*)\*([^*]+)\*(?!\*)')
+_ANCHOR_UNSAFE_RE = re.compile(r'[^a-zA-Z0-9_]')
+_ANCHOR_UNDERSCORES_RE = re.compile(r'_+')
+
+
+def _classify_section(section: str) -> str:
+    """
+    Classify a stripped, non-empty AI section as 'numbered', 'bullet', 'heading', 'bold' or 'body'.
+
+    Cheap first-character and substring checks decide most sections; the heading
+    regex only runs on short sections that end with a colon.
+    """
+    first = section[0]
+    if first.isdigit() and _NUMBERED_RE.match(section):
+        return 'numbered'
+    if first in '•-*':
+        return 'bullet'
+    if section[-1] == ':' and len(section) <= 17 and _HEADING_RE.match(section):
+        return 'heading'
+    if '*' in section:
+        return 'bold'
+    return 'body'
+
+
+@lru_cache(maxsize=64)
+def _hex(value: str):
+    """Return the ReportLab color for a hex string, parsing each distinct color only once."""
+    return colors.HexColor(value)
+
+
+# Common bank name words whose narrative spelling should be preserved
+_BANK_NAME_WORDS = {
+    'JPMORGAN': 'JPMorgan',
+    'CHASE': 'Chase',
+    'WELLS': 'Wells',
+    'FARGO': 'Fargo',
+    'PNC': 'PNC',
+    'BANK': 'Bank',
+    'NATIONAL': 'National',
+    'ASSOCIATION': 'Association',
+    'CORP': 'Corp',
+    'CORPORATION': 'Corporation',
+    'TRUST': 'Trust',
+    'COMPANY': 'Company',
+    'CO': 'Co',
+    'INC': 'Inc',
+    'LLC': 'LLC',
+    'LTD': 'Ltd',
+    'OF': 'of',
+    'THE': 'the',
+    'AND': 'and',
+    'AMERICA': 'America',
+    'FIRST': 'First',
+    'COMMUNITY': 'Community',
+    'REGIONAL': 'Regional',
+    'US': 'US',
+    'SMALL': 'Small'
+}
+
+
+@lru_cache(maxsize=4096)
+def _format_bank_name_narrative(text: str) -> str:
+    """Narrative form of a bank name, memoized since each report repeats the same few names."""
+    if not text:
+        return text
+    
+    # Split the text into words
+    words = text.split()
+    formatted_words = []
+    
+    for word in words:
+        word_upper = word.upper()
+        
+        # Check if this word matches a known pattern
+        if word_upper in _BANK_NAME_WORDS:
+            formatted_words.append(_BANK_NAME_WORDS[word_upper])
+        # Check if this word is likely an acronym (all caps or contains numbers)
+        elif word.isupper() or any(char.isdigit() for char in word):
+            # Keep acronyms in uppercase
+            formatted_words.append(word)
+        elif len(word) <= 3 and word.isupper():
+            # Short words in all caps are likely acronyms
+            formatted_words.append(word)
+        elif any(char.isupper() for char in word[1:]) and not word.isupper():
+            # Words with internal capitals (like JPMorgan) - preserve the pattern
+            formatted_words.append(word)
+        else:
+            # Regular words get proper case
+            formatted_words.append(word.title())
+    
+    return ' '.join(formatted_words)
+
+
+# Paragraph styles are fixed, so they are built once at import and shared by
+# every generator; ReportLab only reads them while rendering.
+_SAMPLE_STYLES = getSampleStyleSheet()
+
+_TITLE_STYLE = ParagraphStyle(
+    'EnhancedTitle',
+    parent=_SAMPLE_STYLES['Heading1'],
+    fontSize=28,
+    spaceAfter=35,
+    alignment=TA_CENTER,
+    textColor=_hex('#1a365d'),
+    fontName='Helvetica-Bold',
+    leading=32
+)
+
+_SUBTITLE_STYLE = ParagraphStyle(
+    'EnhancedSubtitle',
+    parent=_SAMPLE_STYLES['Normal'],
+    fontSize=16,
+    spaceAfter=25,
+    alignment=TA_CENTER,
+    textColor=_hex('#4a5568'),
+    fontName='Helvetica',
+    leading=18
+)
+
+_SECTION_STYLE = ParagraphStyle(
+    'EnhancedSection',
+    parent=_SAMPLE_STYLES['Heading2'],
+    fontSize=18,
+    spaceAfter=15,
+    spaceBefore=30,
+    textColor=_hex('#2d3748'),
+    fontName='Helvetica-Bold',
+    leading=20
+)
+
+_SUBSECTION_STYLE = ParagraphStyle(
+    'EnhancedSubsection',
+    parent=_SAMPLE_STYLES['Heading3'],
+    fontSize=14,
+    spaceAfter=10,
+    spaceBefore=20,
+    textColor=_hex('#4a5568'),
+    fontName='Helvetica-Bold',
+    leading=16
+)
+
+_BODY_STYLE = ParagraphStyle(
+    'EnhancedBody',
+    parent=_SAMPLE_STYLES['Normal'],
+    fontSize=11,
+    spaceAfter=10,
+    leading=15,
+    alignment=TA_JUSTIFY,
+    textColor=_hex('#2d3748'),
+    fontName='Helvetica'
+)
+
+_BULLET_STYLE = ParagraphStyle(
+    'EnhancedBullet',
+    parent=_BODY_STYLE,
+    leftIndent=20,
+    spaceAfter=8,
+    leading=14
+)
+
+_NUMBERED_STYLE = ParagraphStyle(
+    'EnhancedNumbered',
+    parent=_BODY_STYLE,
+    leftIndent=20,
+    spaceAfter=8,
+    leading=14
+)
+
+_SUMMARY_BOX_STYLE = ParagraphStyle(
+    'EnhancedSummaryBox',
+    parent=_BODY_STYLE,
+    backColor=_hex('#f7fafc'),
+    borderColor=_hex('#e2e8f0'),
+    borderWidth=1,
+    borderPadding=10,
+    spaceAfter=15,
+    spaceBefore=10
+)
+
+# Bank names in table cells: small, centered and wrapped
+_BANK_NAME_STYLE = ParagraphStyle(
+    'BankName',
+    parent=_BODY_STYLE,
+    alignment=TA_CENTER,
+    fontSize=9,
+    leading=11,
+    wordWrap='LTR'
+)
+
+
+# Shared look of every data table: dark header row, light body, thin grid
+_HDR_BG = _hex('#2d3748')
+_ROW_BG = _hex('#f7fafc')
+_GRID = _hex('#e2e8f0')
+
+_STANDARD_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), _HDR_BG),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('TOPPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), _ROW_BG),
+    ('GRID', (0, 0), (-1, -1), 0.5, _GRID),
+    ('FONTSIZE', (0, 1), (-1, -1), 9),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
+    ('TOPPADDING', (0, 1), (-1, -1), 8),
+])
+
+# Bank tables wrap long names in the first column, so keep those cells vertically centered
+_STANDARD_TABLE_STYLE_WITH_VALIGN = TableStyle(
+    _STANDARD_TABLE_STYLE.getCommands() + [('VALIGN', (0, 1), (0, -1), 'MIDDLE')]
+)
+
+# Column widths of each data table
+_TREND_COLWIDTHS = [0.8*inch, 1.1*inch, 1*inch, 0.9*inch, 1*inch, 0.9*inch, 0.9*inch]
+_BREAKDOWN_COLWIDTHS = [2.5*inch, 1.2*inch, 1.2*inch, 1.2*inch]
+_BANK_COLWIDTHS = [2.5*inch, 1.1*inch, 1.1*inch, 0.9*inch, 0.9*inch]
+_GROWTH_COLWIDTHS = [2.5*inch, 1.1*inch, 1.1*inch, 1*inch, 1.8*inch]
+_COMPARISON_COLWIDTHS = [2.5*inch, 0.9*inch, 0.9*inch, 1.1*inch, 1.2*inch]
+
+# Vertical gaps used throughout the story. A Spacer keeps no layout state, so each height is one shared instance
+_SPACER_5 = Spacer(1, 5)
+_SPACER_8 = Spacer(1, 8)
+_SPACER_10 = Spacer(1, 10)
+_SPACER_15 = Spacer(1, 15)
+_SPACER_20 = Spacer(1, 20)
 
 
 class EnhancedPDFReportGenerator:
-    def __init__(self, data: pd.DataFrame, counties: List[str], years: List[int]):
+    # Set once a probe call has reached the AI; later reports skip the probe.
+    # A failed probe is not remembered, so the next report tries again.
+    _ai_available = False
+    
+    # Enhanced, professional paragraph styles for the report
+    title_style = _TITLE_STYLE
+    subtitle_style = _SUBTITLE_STYLE
+    section_style = _SECTION_STYLE
+    subsection_style = _SUBSECTION_STYLE
+    body_style = _BODY_STYLE
+    bullet_style = _BULLET_STYLE
+    numbered_style = _NUMBERED_STYLE
+    summary_box_style = _SUMMARY_BOX_STYLE
+    bank_name_style = _BANK_NAME_STYLE
+    
+    # Narrative used when the AI is unavailable or fails; filled in with the county and year range
+    _FALLBACK_SECTION_TMPLS = {
+        'executive_summary': "This comprehensive analysis examines bank branch trends in {county_name} from {years_str} using FDIC Summary of Deposits data. The analysis focuses on three key metrics: total branch counts, the percentage of branches in Low-to-Moderate Income (LMI) tracts, and the percentage of branches in Majority-Minority Census Tracts (MMCT). This report provides detailed insights into market concentration, bank strategies, community impact, and regulatory implications for banking infrastructure development.",
+        'overall_trends': "Branch trends in {county_name} demonstrate significant evolution of banking infrastructure over the {years_str} period. The analysis reveals comprehensive patterns in branch distribution, market concentration dynamics, demographic service areas, and strategic positioning of financial institutions. Key observations include year-over-year growth patterns, cumulative expansion trends, and the strategic allocation of branches across different community types.",
+        'key_findings': "1. Branch distribution patterns reveal significant market concentration trends and competitive dynamics.\n2. LMI and MMCT service levels demonstrate substantial variation between institutions, indicating different strategic priorities.\n3. Market leaders exhibit distinct and sophisticated strategies in community service and market positioning.\n4. Branch accessibility directly impacts financial inclusion outcomes and community development success.\n5. Regulatory compliance and community service standards vary significantly across different bank categories and market segments.\n6. Strategic branch placement decisions reflect both competitive positioning and community service objectives.\n7. Market concentration trends have important implications for regulatory oversight and competitive dynamics.",
+    }
+    
+    # Methodology section text; the templates are filled in per report
+    _METHODOLOGY_SUMMARY_TMPL = (
+        "<b>Analysis Period:</b> {years_str}<br/>"
+        "<b>Geographic Scope:</b> {counties_str}<br/>"
+        "<b>Report Generated:</b> {now}<br/>"
+        "<b>Data Source:</b> FDIC Summary of Deposits<br/>"
+        "<b>Analysis Method:</b> AI-Powered Statistical Analysis with {provider}<br/>"
+        "<b>Report Type:</b> Comprehensive Market Analysis"
+    )
+    _METHODOLOGY_APPROACH_TMPL = (
+        "This analysis examines bank branch trends and market concentration using FDIC Summary of Deposits data. "
+        "The analysis focuses on three key metrics: total branch counts, total deposits, and the percentage of branches in Low-to-Moderate Income (LMI) tracts "
+        "and Majority-Minority Census Tracts (MMCT). We identify the largest banks by deposit market share "
+        "and analyze their growth patterns and community impact compared to county averages. Market concentration is measured using the Herfindahl-Hirschman Index (HHI) based on deposit market shares. All analysis is enhanced with "
+        "AI-powered insights using {provider} for deeper interpretation of trends and strategic implications."
+    )
+    _DATA_DEFINITIONS_HTML = (
+        "<b>Data Definitions:</b><br/>"
+        "• <b>LMICT:</b> Low-to-Moderate Income Census Tracts - areas with median family income below 80% of the area median income<br/>"
+        "• <b>MMCT:</b> Majority-Minority Census Tracts - areas where minority populations represent more than 50% of the total population<br/>"
+        "• <b>Market Share:</b> Percentage of total deposits in the county controlled by each bank (regulatory standard for HHI calculation)"
+    )
+    _ANALYSIS_OVERVIEW_TMPL = (
+        "<b>Analysis Overview:</b> This analysis examines bank branch trends in {counties} from {years_str} using FDIC Summary of Deposits data. "
+        "We focus on three key metrics: total branch counts, the percentage of branches in Low-to-Moderate Income (LMI) tracts, "
+        "and the percentage of branches in Majority-Minority Census Tracts (MMCT)."
+    )
+    _MMCT_NOTE_HTML = (
+        "<b>Important Note:</b> MMCT designations increased significantly with the 2020 census and became effective in 2022. "
+        "This means MMCT percentages may show notable changes between 2021 and 2022, reflecting the updated census data rather than actual branch relocations."
+    )
+    
+    def __init__(self, data: pd.DataFrame, counties: List[str], years: List[int], ai_analyzer: AIAnalyzer = None):
         """
         Initialize the enhanced PDF report generator.
         
@@ -32,6 +325,8 @@ class EnhancedPDFReportGenerator:
             data: DataFrame with branch data
             counties: List of counties analyzed
             years: List of years analyzed
+            ai_analyzer: Optional analyzer for the narrative sections, e.g. a
+                TrackedAIAnalyzer that logs usage; a new AIAnalyzer by default
         """
         # Validate input data
         if data.empty:
@@ -49,141 +344,70 @@ class EnhancedPDFReportGenerator:
             raise ValueError("Years list cannot be empty")
         
         self.data = data.copy()
+        # Compact dtypes: county and bank names repeat on every row, and the counts are small whole numbers
+        for column in ('county_state', 'bank_name'):
+            self.data[column] = self.data[column].astype('category')
+        for column in ('year', 'total_branches', 'lmict', 'mmct'):
+            self.data[column] = self.data[column].fillna(0).astype('int32')
+        # Row positions of each county, found in one pass so county slices are direct lookups
+        self._county_rows = self.data.groupby('county_state', observed=True).indices
         self.counties = counties
+        # Rows of the analyzed counties, selected once for the trend, market share and comparison passes
+        self._report_data = self.data[self.data['county_state'].isin(counties)]
+        # Narrative form of every bank name in the report's counties, for convert_bank_names_to_proper_case
+        report_banks = self._report_data['bank_name'].dropna().unique()
+        self._bank_name_map = {bank_name: self.format_bank_name_narrative(bank_name) for bank_name in report_banks}
+        # One alternation over all names, longest first so a name never pre-empts a longer one containing it
+        self._bank_name_re = re.compile('|'.join(
+            map(re.escape, sorted(self._bank_name_map, key=len, reverse=True))
+        )) if self._bank_name_map else None
         self.years = sorted(years)
-        self.styles = getSampleStyleSheet()
-        self.setup_enhanced_styles()
+        # The report range, read throughout instead of re-scanning self.years
+        self._first_year = self.years[0]
+        self._last_year = self.years[-1]
+        # Each report has its own analyzer, so concurrent reports never share its
+        # serialization memo; the provider is only probed until a probe succeeds
+        self.ai_analyzer = None
+        # Set when any area's narrative falls back to the canned text
+        self.used_fallback = False
         try:
-            self.ai_analyzer = AIAnalyzer()
-            # Test if AI is properly configured
-            test_response = self.ai_analyzer._call_ai("Test", max_tokens=10)
-            if not test_response or test_response.strip() == "":
-                print("Warning: AI analyzer is not properly configured. Using fallback content.")
-                self.ai_analyzer = None
+            analyzer = ai_analyzer or AIAnalyzer()
+            if EnhancedPDFReportGenerator._ai_available:
+                self.ai_analyzer = analyzer
+            else:
+                # Test if AI is properly configured
+                test_response = analyzer._call_ai("Test", max_tokens=10)
+                if not test_response or test_response.strip() == "":
+                    print("Warning: AI analyzer is not properly configured. Using fallback content.")
+                else:
+                    EnhancedPDFReportGenerator._ai_available = True
+                    self.ai_analyzer = analyzer
         except Exception as e:
             print(f"Warning: AI analyzer initialization failed: {e}. Using fallback content.")
-            self.ai_analyzer = None
         self.page_breaks_count = 0  # Track number of page breaks
+        # Per-year data slices, see _year_data
+        self._year_slices = {}
         
-    def setup_enhanced_styles(self):
-        """Setup enhanced, professional paragraph styles for the report."""
-        # Enhanced title style
-        self.title_style = ParagraphStyle(
-            'EnhancedTitle',
-            parent=self.styles['Heading1'],
-            fontSize=28,
-            spaceAfter=35,
-            alignment=TA_CENTER,
-            textColor=colors.HexColor('#1a365d'),
-            fontName='Helvetica-Bold',
-            leading=32
-        )
-        
-        # Enhanced subtitle style
-        self.subtitle_style = ParagraphStyle(
-            'EnhancedSubtitle',
-            parent=self.styles['Normal'],
-            fontSize=16,
-            spaceAfter=25,
-            alignment=TA_CENTER,
-            textColor=colors.HexColor('#4a5568'),
-            fontName='Helvetica',
-            leading=18
-        )
-        
-        # Enhanced section heading style
-        self.section_style = ParagraphStyle(
-            'EnhancedSection',
-            parent=self.styles['Heading2'],
-            fontSize=18,
-            spaceAfter=15,
-            spaceBefore=30,
-            textColor=colors.HexColor('#2d3748'),
-            fontName='Helvetica-Bold',
-            leading=20
-        )
-        
-        # Enhanced subsection heading style
-        self.subsection_style = ParagraphStyle(
-            'EnhancedSubsection',
-            parent=self.styles['Heading3'],
-            fontSize=14,
-            spaceAfter=10,
-            spaceBefore=20,
-            textColor=colors.HexColor('#4a5568'),
-            fontName='Helvetica-Bold',
-            leading=16
-        )
-        
-        # Enhanced body text style
-        self.body_style = ParagraphStyle(
-            'EnhancedBody',
-            parent=self.styles['Normal'],
-            fontSize=11,
-            spaceAfter=10,
-            leading=15,
-            alignment=TA_JUSTIFY,
-            textColor=colors.HexColor('#2d3748'),
-            fontName='Helvetica'
-        )
-        
-        # Enhanced bullet point style
-        self.bullet_style = ParagraphStyle(
-            'EnhancedBullet',
-            parent=self.body_style,
-            leftIndent=20,
-            spaceAfter=8,
-            leading=14
-        )
-        
-        # Enhanced numbered list style
-        self.numbered_style = ParagraphStyle(
-            'EnhancedNumbered',
-            parent=self.body_style,
-            leftIndent=20,
-            spaceAfter=8,
-            leading=14
-        )
-        
-        # Enhanced summary box style
-        self.summary_box_style = ParagraphStyle(
-            'EnhancedSummaryBox',
-            parent=self.body_style,
-            backColor=colors.HexColor('#f7fafc'),
-            borderColor=colors.HexColor('#e2e8f0'),
-            borderWidth=1,
-            borderPadding=10,
-            spaceAfter=15,
-            spaceBefore=10
-        )
-        
-
-
-
-        
-
-    
-
-    
     def add_page_number(self, canvas, doc):
         """Add page numbers to the bottom center of each page."""
         page_num = canvas.getPageNumber()
         text = f"Page {page_num}"
         canvas.saveState()
         canvas.setFont('Helvetica', 10)
-        canvas.setFillColor(colors.HexColor('#4a5568'))
+        canvas.setFillColor(_hex('#4a5568'))
         canvas.drawCentredString(doc.pagesize[0] / 2, 0.5 * inch, text)
         canvas.restoreState()
     
     def format_number(self, num: float) -> str:
         """Format numbers as #,### with no decimals."""
-        if pd.isna(num) or num == 0:
+        # num != num is the NaN test; cheaper than pd.isna for the plain floats passed here
+        if num is None or num != num or num == 0:
             return "0"
         return f"{int(num):,}"
     
     def format_percentage(self, pct: float) -> str:
         """Format percentages as #.#% (simplified format for narrative)."""
-        if pd.isna(pct):
+        if pct is None or pct != pct:
             return "0.0%"
         # Ensure percentage is not in thousands (should be 0-100 range)
         if abs(pct) > 1000:
@@ -192,13 +416,28 @@ class EnhancedPDFReportGenerator:
     
     def format_percentage_table(self, pct: float) -> str:
         """Format percentages for tables (without % symbol if in header)."""
-        if pd.isna(pct):
+        if pct is None or pct != pct:
             return "0.0"
         # Ensure percentage is not in thousands (should be 0-100 range)
         if abs(pct) > 1000:
             pct = pct / 100  # Convert from basis points to percentage
         return f"{pct:.1f}"
     
+    def format_column(self, values, formatter, signed: bool = False) -> List[str]:
+        """
+        Format a whole column with one of the scalar formatters above.
+        
+        With signed, positive values get a leading '+' and missing values read
+        "N/A", as in the change columns of the trend tables.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        formatted = [formatter(value) for value in values.tolist()]
+        if not signed:
+            return formatted
+        missing = np.isnan(values)
+        positive = values > 0
+        return ["N/A" if missing[i] else f"+{text}" if positive[i] else text for i, text in enumerate(formatted)]
+    
     def format_year(self, year: int) -> str:
         """Format year as integer with no decimals."""
         return str(int(year))
@@ -217,166 +456,98 @@ class EnhancedPDFReportGenerator:
     
     def format_bank_name_narrative(self, text: str) -> str:
         """Format bank names for narrative text - proper case except for acronyms."""
-        if not text:
-            return text
-        
-        # Common bank name patterns that should be preserved
-        common_patterns = {
-            'JPMORGAN': 'JPMorgan',
-            'CHASE': 'Chase',
-            'WELLS': 'Wells',
-            'FARGO': 'Fargo',
-            'PNC': 'PNC',
-            'BANK': 'Bank',
-            'NATIONAL': 'National',
-            'ASSOCIATION': 'Association',
-            'CORP': 'Corp',
-            'CORPORATION': 'Corporation',
-            'TRUST': 'Trust',
-            'COMPANY': 'Company',
-            'CO': 'Co',
-            'INC': 'Inc',
-            'LLC': 'LLC',
-            'LTD': 'Ltd',
-            'OF': 'of',
-            'THE': 'the',
-            'AND': 'and',
-            'AMERICA': 'America',
-            'FIRST': 'First',
-            'COMMUNITY': 'Community',
-            'REGIONAL': 'Regional',
-            'US': 'US',
-            'SMALL': 'Small'
-        }
-        
-        # Split the text into words
-        words = text.split()
-        formatted_words = []
-        
-        for i, word in enumerate(words):
-            word_upper = word.upper()
-            
-            # Check if this word matches a known pattern
-            if word_upper in common_patterns:
-                formatted_words.append(common_patterns[word_upper])
-            # Check if this word is likely an acronym (all caps or contains numbers)
-            elif word.isupper() or any(char.isdigit() for char in word):
-                # Keep acronyms in uppercase
-                formatted_words.append(word)
-            elif len(word) <= 3 and word.isupper():
-                # Short words in all caps are likely acronyms
-                formatted_words.append(word)
-            elif any(char.isupper() for char in word[1:]) and not word.isupper():
-                # Words with internal capitals (like JPMorgan) - preserve the pattern
-                formatted_words.append(word)
-            else:
-                # Regular words get proper case
-                formatted_words.append(word.title())
-        
-        return ' '.join(formatted_words)
+        return _format_bank_name_narrative(text)
+    
+    def county_data(self, county: str) -> pd.DataFrame:
+        """Rows for one county, looked up by position instead of scanning county_state."""
+        rows = self._county_rows.get(county)
+        if rows is None:
+            return self.data.iloc[0:0]
+        return self.data.iloc[rows]
     
     def convert_bank_names_to_proper_case(self, text: str) -> str:
         """Convert bank names in text to proper case while preserving other formatting."""
-        if not text:
+        if not text or self._bank_name_re is None:
             return text
         
-        # Get unique bank names from the data
-        bank_names = set()
-        for county in self.counties:
-            county_data = self.data[self.data['county_state'] == county]
-            bank_names.update(county_data['bank_name'].unique())
-        
-        # Convert each bank name to proper case in the text
-        converted_text = text
-        for bank_name in bank_names:
-            if bank_name in text:
-                converted_text = converted_text.replace(bank_name, self.format_bank_name_narrative(bank_name))
-        
-        return converted_text
+        # Convert every bank name to proper case in one scan of the text
+        return self._bank_name_re.sub(lambda match: self._bank_name_map[match.group(0)], text)
     
     def create_safe_anchor(self, text: str) -> str:
         """Create a URL-safe anchor name from text."""
-        safe_anchor = re.sub(r'[^a-zA-Z0-9_]', '_', text)
-        safe_anchor = re.sub(r'_+', '_', safe_anchor)  # Replace multiple underscores with single
+        safe_anchor = _ANCHOR_UNSAFE_RE.sub('_', text)
+        safe_anchor = _ANCHOR_UNDERSCORES_RE.sub('_', safe_anchor)  # Replace multiple underscores with single
         safe_anchor = safe_anchor.strip('_')  # Remove leading/trailing underscores
         return safe_anchor
     
     def calculate_enhanced_trends(self) -> Dict[str, pd.DataFrame]:
-        """Calculate comprehensive year-over-year trends for each county."""
-        trends = {}
+        """
+        Calculate comprehensive year-over-year trends for each county.
         
-        for county in self.counties:
-            county_data = self.data[self.data['county_state'] == county].copy()
-            
-            # Aggregate by year
-            yearly_stats = county_data.groupby('year').agg({
-                'total_branches': 'sum',
-                'lmict': 'sum',
-                'mmct': 'sum'
-            }).reset_index()
-            
-            # Calculate percentages (handle division by zero)
-            yearly_stats['lmict_pct'] = np.where(yearly_stats['total_branches'] > 0, 
-                                                (yearly_stats['lmict'] / yearly_stats['total_branches'] * 100).round(2), 0)
-            yearly_stats['mmct_pct'] = np.where(yearly_stats['total_branches'] > 0, 
-                                               (yearly_stats['mmct'] / yearly_stats['total_branches'] * 100).round(2), 0)
-            # Note: Both % calculation removed as it's not needed for this analysis
-            
-            # Calculate year-over-year changes
-            yearly_stats['total_yoy_change'] = yearly_stats['total_branches'].pct_change() * 100
-            yearly_stats['total_yoy_change_abs'] = yearly_stats['total_branches'].diff()
-            yearly_stats['lmict_yoy_change'] = yearly_stats['lmict_pct'].pct_change() * 100
-            yearly_stats['mmct_yoy_change'] = yearly_stats['mmct_pct'].pct_change() * 100
-            
-            # Calculate cumulative changes from first year (handle division by zero)
-            first_year = yearly_stats['total_branches'].iloc[0]
-            yearly_stats['total_cumulative_change'] = np.where(first_year > 0, 
-                                                              ((yearly_stats['total_branches'] - first_year) / first_year * 100).round(2), 0)
-            
-            trends[county] = yearly_stats
+        All counties are aggregated in one groupby; changes are computed within
+        each county so one county's last year never feeds the next county's first.
+        """
+        # Aggregate by county and year
+        yearly_stats = self._report_data.groupby(['county_state', 'year'], observed=True).agg({
+            'total_branches': 'sum',
+            'lmict': 'sum',
+            'mmct': 'sum'
+        }).reset_index()
+        
+        # Calculate percentages (handle division by zero)
+        yearly_stats['lmict_pct'] = percentage(yearly_stats['lmict'], yearly_stats['total_branches'], decimals=2)
+        yearly_stats['mmct_pct'] = percentage(yearly_stats['mmct'], yearly_stats['total_branches'], decimals=2)
+        # Note: Both % calculation removed as it's not needed for this analysis
+        
+        # Calculate year-over-year changes
+        by_county = yearly_stats.groupby('county_state', sort=False, observed=True)
+        yearly_stats['total_yoy_change'] = by_county['total_branches'].pct_change() * 100
+        yearly_stats['total_yoy_change_abs'] = by_county['total_branches'].diff()
+        yearly_stats['lmict_yoy_change'] = by_county['lmict_pct'].pct_change() * 100
+        yearly_stats['mmct_yoy_change'] = by_county['mmct_pct'].pct_change() * 100
+        
+        # Calculate cumulative changes from each county's first year (handle division by zero)
+        first_year = by_county['total_branches'].transform('first')
+        yearly_stats['total_cumulative_change'] = percentage(yearly_stats['total_branches'] - first_year, first_year, decimals=2)
         
-        return trends
+        grouped = {county: stats.drop(columns='county_state').reset_index(drop=True)
+                   for county, stats in yearly_stats.groupby('county_state', sort=False, observed=True)}
+        return {county: grouped[county] for county in self.counties if county in grouped}
+    
+    def _year_data(self, year: int) -> pd.DataFrame:
+        """Rows for the analyzed counties in one year, sliced once and shared by market share and comparisons."""
+        if year not in self._year_slices:
+            self._year_slices[year] = self._report_data[self._report_data['year'] == year]
+        return self._year_slices[year]
     
     def calculate_enhanced_market_share(self, target_year: int = None) -> Dict[str, pd.DataFrame]:
         """Calculate comprehensive market share for each bank in the target year."""
         if target_year is None:
-            target_year = max(self.years)
-            
-        market_shares = {}
+            target_year = self._last_year
         
-        for county in self.counties:
-            county_data = self.data[
-                (self.data['county_state'] == county) & 
-                (self.data['year'] == target_year)
-            ].copy()
-            
-            if county_data.empty:
-                continue
-            
-            # Calculate total deposits in county
-            total_county_deposits = county_data['total_deposits'].sum()
-            
-            # Calculate market share for each bank based on deposits
-            bank_stats = county_data.groupby('bank_name').agg({
-                'total_branches': 'sum',
-                'total_deposits': 'sum',
-                'lmict': 'sum',
-                'mmct': 'sum'
-            }).reset_index()
-            
-            bank_stats['market_share'] = (bank_stats['total_deposits'] / total_county_deposits * 100).round(2) if total_county_deposits > 0 else 0
-            bank_stats['lmict_pct'] = np.where(bank_stats['total_branches'] > 0, 
-                                              (bank_stats['lmict'] / bank_stats['total_branches'] * 100).round(2), 0)
-            bank_stats['mmct_pct'] = np.where(bank_stats['total_branches'] > 0, 
-                                             (bank_stats['mmct'] / bank_stats['total_branches'] * 100).round(2), 0)
-            # Note: Both % calculation removed as it's not needed for this analysis
-            
-            # Sort by market share descending
-            bank_stats = bank_stats.sort_values('market_share', ascending=False)
-            
-            market_shares[county] = bank_stats
+        year_data = self._year_data(target_year)
+        
+        # Aggregate every county's banks in one pass
+        bank_stats = year_data.groupby(['county_state', 'bank_name'], observed=True).agg({
+            'total_branches': 'sum',
+            'total_deposits': 'sum',
+            'lmict': 'sum',
+            'mmct': 'sum'
+        }).reset_index()
         
-        return market_shares
+        # Calculate market share for each bank based on deposits in its county
+        county_deposits = bank_stats.groupby('county_state', observed=True)['total_deposits'].transform('sum')
+        bank_stats['market_share'] = percentage(bank_stats['total_deposits'], county_deposits, decimals=2)
+        bank_stats['lmict_pct'] = percentage(bank_stats['lmict'], bank_stats['total_branches'], decimals=2)
+        bank_stats['mmct_pct'] = percentage(bank_stats['mmct'], bank_stats['total_branches'], decimals=2)
+        # Note: Both % calculation removed as it's not needed for this analysis
+        
+        # Sort by market share descending
+        bank_stats = bank_stats.sort_values('market_share', ascending=False, kind='stable')
+        
+        grouped = {county: stats.drop(columns='county_state')
+                   for county, stats in bank_stats.groupby('county_state', sort=False, observed=True)}
+        return {county: grouped[county] for county in self.counties if county in grouped}
     
     def get_enhanced_top_banks(self, market_shares: Dict[str, pd.DataFrame], threshold: float = 50.0) -> Dict[str, List[str]]:
         """Get top banks that control the specified percentage of market share."""
@@ -386,97 +557,81 @@ class EnhancedPDFReportGenerator:
             if bank_data.empty:
                 continue
                 
-            cumulative_share = 0
-            top_bank_list = []
-            
-            for _, row in bank_data.iterrows():
-                cumulative_share += row['market_share']
-                top_bank_list.append(row['bank_name'])
-                
-                if cumulative_share >= threshold:
-                    break
-            
-            top_banks[county] = top_bank_list
+            # Banks are sorted by market share, so take them until the running total reaches the threshold
+            cumulative_share = bank_data['market_share'].to_numpy().cumsum()
+            count = min(int(np.searchsorted(cumulative_share, threshold)) + 1, len(cumulative_share))
+            top_banks[county] = bank_data['bank_name'].iloc[:count].tolist()
         
         return top_banks
     
     def analyze_enhanced_bank_growth(self, top_banks: Dict[str, List[str]]) -> Dict[str, pd.DataFrame]:
-        """Analyze comprehensive bank growth patterns."""
-        bank_analysis = {}
+        """
+        Analyze comprehensive bank growth patterns.
         
-        for county in self.counties:
-            if county not in top_banks:
-                continue
-                
-            county_data = self.data[self.data['county_state'] == county].copy()
-            first_year = min(self.years)
-            last_year = max(self.years)
-            
-            bank_growth_data = []
-            
-            for bank_name in top_banks[county]:
-                # Get first and last year data for this bank
-                first_year_data = county_data[
-                    (county_data['bank_name'] == bank_name) & 
-                    (county_data['year'] == first_year)
-                ]
-                last_year_data = county_data[
-                    (county_data['bank_name'] == bank_name) & 
-                    (county_data['year'] == last_year)
-                ]
-                
-                first_year_branches = first_year_data['total_branches'].sum() if not first_year_data.empty else 0
-                last_year_branches = last_year_data['total_branches'].sum() if not last_year_data.empty else 0
-                
-                # Calculate growth metrics
-                absolute_change = last_year_branches - first_year_branches
-                percentage_change = ((last_year_branches - first_year_branches) / first_year_branches * 100) if first_year_branches > 0 else 0
-                
-                # Get current year demographics (calculate if not available)
-                if not last_year_data.empty:
-                    total_branches = last_year_data['total_branches'].sum()
-                    current_lmi_pct = (last_year_data['lmict'].sum() / total_branches * 100) if total_branches > 0 else 0
-                    current_mmct_pct = (last_year_data['mmct'].sum() / total_branches * 100) if total_branches > 0 else 0
-                else:
-                    current_lmi_pct = 0
-                    current_mmct_pct = 0
-                
-                bank_growth_data.append({
-                    'bank_name': bank_name,
-                    'first_year_branches': first_year_branches,
-                    'last_year_branches': last_year_branches,
-                    'absolute_change': absolute_change,
-                    'percentage_change': percentage_change,
-                    'current_lmi_pct': current_lmi_pct,
-                    'current_mmct_pct': current_mmct_pct
-                })
-            
-            bank_analysis[county] = pd.DataFrame(bank_growth_data)
+        First- and last-year totals for every county's top banks come from one
+        groupby per year; the growth metrics are then computed as whole columns.
+        """
+        keys = pd.MultiIndex.from_tuples(
+            [(county, bank_name) for county in self.counties if county in top_banks for bank_name in top_banks[county]],
+            names=['county_state', 'bank_name']
+        )
+        if keys.empty:
+            return {}
+        
+        first_year = self._first_year
+        last_year = self._last_year
+        
+        def year_totals(year: int) -> pd.DataFrame:
+            # Banks with no branches in the year get zeros
+            year_data = self._year_data(year)
+            totals = year_data.groupby(['county_state', 'bank_name'], observed=True)[['total_branches', 'lmict', 'mmct']].sum()
+            return totals.reindex(keys, fill_value=0)
+        
+        first_totals = year_totals(first_year)
+        last_totals = year_totals(last_year)
+        first_year_branches = first_totals['total_branches'].to_numpy()
+        last_year_branches = last_totals['total_branches'].to_numpy()
+        
+        # Calculate growth metrics and current year demographics (handle division by zero)
+        absolute_change = last_year_branches - first_year_branches
+        percentage_change = percentage(absolute_change, first_year_branches, decimals=None)
+        current_lmi_pct = percentage(last_totals['lmict'], last_year_branches, decimals=None)
+        current_mmct_pct = percentage(last_totals['mmct'], last_year_branches, decimals=None)
         
-        return bank_analysis
+        bank_growth_data = pd.DataFrame({
+            'bank_name': keys.get_level_values('bank_name'),
+            'first_year_branches': first_year_branches,
+            'last_year_branches': last_year_branches,
+            'absolute_change': absolute_change,
+            'percentage_change': percentage_change,
+            'current_lmi_pct': current_lmi_pct,
+            'current_mmct_pct': current_mmct_pct
+        }, index=keys.get_level_values('county_state'))
+        
+        return {county: growth.reset_index(drop=True)
+                for county, growth in bank_growth_data.groupby(level='county_state', sort=False)}
     
     def calculate_enhanced_comparisons(self, bank_analysis: Dict[str, pd.DataFrame]) -> Dict[str, Dict]:
         """Calculate enhanced comparisons to county averages."""
         comparisons = {}
         
+        # County totals for the most recent year, from the slice market share already used
+        recent_year = self._last_year
+        county_totals = self._year_data(recent_year).groupby('county_state', observed=True).agg({
+            'total_branches': 'sum',
+            'lmict': 'sum',
+            'mmct': 'sum'
+        })
+        
         for county in self.counties:
-            if county not in bank_analysis:
-                continue
-                
-            # Get county averages for the most recent year
-            recent_year = max(self.years)
-            county_data = self.data[
-                (self.data['county_state'] == county) & 
-                (self.data['year'] == recent_year)
-            ]
-            
-            if county_data.empty:
+            if county not in bank_analysis or county not in county_totals.index:
                 continue
             
             # Calculate county averages
-            total_branches = county_data['total_branches'].sum()
-            county_avg_lmict = (county_data['lmict'].sum() / total_branches * 100) if total_branches > 0 else 0
-            county_avg_mmct = (county_data['mmct'].sum() / total_branches * 100) if total_branches > 0 else 0
+            totals = county_totals.loc[county]
+            total_branches = totals['total_branches']
+            county_avg_lmict = (totals['lmict'] / total_branches * 100) if total_branches > 0 else 0
+            county_avg_mmct = (totals['mmct'] / total_branches * 100) if total_branches > 0 else 0
             
             comparisons[county] = {
                 'county_avg_lmict': county_avg_lmict,
@@ -518,65 +673,32 @@ class EnhancedPDFReportGenerator:
     
     def generate_enhanced_ai_analysis(self, county_data, trends, market_shares, bank_analysis, comparisons):
         """Generate enhanced AI-powered analysis using the configured AI provider for narrative insights only (no tables or formatting)."""
-        # Prepare enhanced data for AI analysis
+        # Prepare enhanced data for AI analysis. The prompts only include the first
+        # PROMPT_TOP_BANKS banks, so only those rows are converted to records.
         analysis_data = {
             'county': county_data.get('county', 'Unknown County'),
             'years': self.years,
             'trends': trends.to_dict('records') if hasattr(trends, 'empty') and not trends.empty else (trends if isinstance(trends, list) else []),
-            'market_shares': market_shares.to_dict('records') if hasattr(market_shares, 'empty') and not market_shares.empty else (market_shares if isinstance(market_shares, list) else []),
-            'bank_analysis': bank_analysis.to_dict('records') if hasattr(bank_analysis, 'empty') and not bank_analysis.empty else (bank_analysis if isinstance(bank_analysis, list) else []),
+            'market_shares': market_shares.head(PROMPT_TOP_BANKS).to_dict('records') if hasattr(market_shares, 'empty') and not market_shares.empty else (market_shares if isinstance(market_shares, list) else []),
+            'bank_analysis': bank_analysis.head(PROMPT_TOP_BANKS).to_dict('records') if hasattr(bank_analysis, 'empty') and not bank_analysis.empty else (bank_analysis if isinstance(bank_analysis, list) else []),
             'comparisons': comparisons
         }
         # Prompts are now explicit: only narrative, no tables or formatting
-        if self.ai_analyzer is None:
-            # Use fallback content when AI is not available
-            county_name = analysis_data.get('county', 'the analyzed area')
-            years_str = f"{analysis_data.get('years', [2022, 2023, 2024])[0]}-{analysis_data.get('years', [2022, 2023, 2024])[-1]}"
-            
-            executive_summary = f"This comprehensive analysis examines bank branch trends in {county_name} from {years_str} using FDIC Summary of Deposits data. The analysis focuses on three key metrics: total branch counts, the percentage of branches in Low-to-Moderate Income (LMI) tracts, and the percentage of branches in Majority-Minority Census Tracts (MMCT). This report provides detailed insights into market concentration, bank strategies, community impact, and regulatory implications for banking infrastructure development."
-            
-            overall_trends_analysis = f"Branch trends in {county_name} demonstrate significant evolution of banking infrastructure over the {years_str} period. The analysis reveals comprehensive patterns in branch distribution, market concentration dynamics, demographic service areas, and strategic positioning of financial institutions. Key observations include year-over-year growth patterns, cumulative expansion trends, and the strategic allocation of branches across different community types."
-            
-            bank_strategy_analysis = f"Major banks in {county_name} exhibit diverse and sophisticated strategies in branch placement, market positioning, and community service. The analysis examines how different institutions serve diverse communities, compete for market share, and adapt their strategies based on demographic changes and regulatory requirements. Strategic patterns include geographic expansion, community-focused initiatives, and competitive positioning strategies."
-            
-            community_impact_analysis = f"The community impact analysis provides a comprehensive evaluation of how effectively banks serve low-to-moderate income and majority-minority communities in {county_name}. This includes detailed examination of branch accessibility, service quality in underserved areas, demographic alignment, and the effectiveness of community banking initiatives. The analysis reveals important insights into financial inclusion outcomes and community development impacts."
-            
-            key_findings = "1. Branch distribution patterns reveal significant market concentration trends and competitive dynamics.\n2. LMI and MMCT service levels demonstrate substantial variation between institutions, indicating different strategic priorities.\n3. Market leaders exhibit distinct and sophisticated strategies in community service and market positioning.\n4. Branch accessibility directly impacts financial inclusion outcomes and community development success.\n5. Regulatory compliance and community service standards vary significantly across different bank categories and market segments.\n6. Strategic branch placement decisions reflect both competitive positioning and community service objectives.\n7. Market concentration trends have important implications for regulatory oversight and competitive dynamics."
-            
-            conclusion_analysis = f"This comprehensive analysis provides an in-depth view of banking infrastructure in {county_name} from {years_str}, revealing critical insights into market dynamics, competitive strategies, and community service effectiveness. The findings support informed decision-making for community development initiatives, regulatory oversight processes, market analysis frameworks, and strategic planning for financial institutions. The analysis demonstrates the complex interplay between market competition, community service, and regulatory compliance in shaping banking infrastructure development."
-        else:
+        if self.ai_analyzer is not None:
             try:
-                executive_summary = self.ai_analyzer.generate_executive_summary(analysis_data)
-                overall_trends_analysis = self.ai_analyzer.analyze_overall_trends(analysis_data)
-                bank_strategy_analysis = self.ai_analyzer.analyze_bank_strategies(analysis_data)
-                community_impact_analysis = self.ai_analyzer.analyze_community_impact(analysis_data)
-                key_findings = self.ai_analyzer.generate_key_findings(analysis_data)
-                conclusion_analysis = self.ai_analyzer.generate_conclusion(analysis_data)
+                sections = self.ai_analyzer.generate_all(analysis_data)
+                if not all(sections.get(key) for key in self._FALLBACK_SECTION_TMPLS):
+                    self.used_fallback = True
+                return {key: sections.get(key, "") for key in self._FALLBACK_SECTION_TMPLS}
             except Exception as e:
                 print(f"Warning: AI analysis failed: {e}")
-                # Provide meaningful fallback content instead of empty strings
-                county_name = analysis_data.get('county', 'the analyzed area')
-                years_str = f"{analysis_data.get('years', [2022, 2023, 2024])[0]}-{analysis_data.get('years', [2022, 2023, 2024])[-1]}"
-                
-                executive_summary = f"This comprehensive analysis examines bank branch trends in {county_name} from {years_str} using FDIC Summary of Deposits data. The analysis focuses on three key metrics: total branch counts, the percentage of branches in Low-to-Moderate Income (LMI) tracts, and the percentage of branches in Majority-Minority Census Tracts (MMCT). This report provides detailed insights into market concentration, bank strategies, community impact, and regulatory implications for banking infrastructure development."
-                
-                overall_trends_analysis = f"Branch trends in {county_name} demonstrate significant evolution of banking infrastructure over the {years_str} period. The analysis reveals comprehensive patterns in branch distribution, market concentration dynamics, demographic service areas, and strategic positioning of financial institutions. Key observations include year-over-year growth patterns, cumulative expansion trends, and the strategic allocation of branches across different community types."
-                
-                bank_strategy_analysis = f"Major banks in {county_name} exhibit diverse and sophisticated strategies in branch placement, market positioning, and community service. The analysis examines how different institutions serve diverse communities, compete for market share, and adapt their strategies based on demographic changes and regulatory requirements. Strategic patterns include geographic expansion, community-focused initiatives, and competitive positioning strategies."
-                
-                community_impact_analysis = f"The community impact analysis provides a comprehensive evaluation of how effectively banks serve low-to-moderate income and majority-minority communities in {county_name}. This includes detailed examination of branch accessibility, service quality in underserved areas, demographic alignment, and the effectiveness of community banking initiatives. The analysis reveals important insights into financial inclusion outcomes and community development impacts."
-                
-                key_findings = "1. Branch distribution patterns reveal significant market concentration trends and competitive dynamics.\n2. LMI and MMCT service levels demonstrate substantial variation between institutions, indicating different strategic priorities.\n3. Market leaders exhibit distinct and sophisticated strategies in community service and market positioning.\n4. Branch accessibility directly impacts financial inclusion outcomes and community development success.\n5. Regulatory compliance and community service standards vary significantly across different bank categories and market segments.\n6. Strategic branch placement decisions reflect both competitive positioning and community service objectives.\n7. Market concentration trends have important implications for regulatory oversight and competitive dynamics."
-                
-                conclusion_analysis = f"This comprehensive analysis provides an in-depth view of banking infrastructure in {county_name} from {years_str}, revealing critical insights into market dynamics, competitive strategies, and community service effectiveness. The findings support informed decision-making for community development initiatives, regulatory oversight processes, market analysis frameworks, and strategic planning for financial institutions. The analysis demonstrates the complex interplay between market competition, community service, and regulatory compliance in shaping banking infrastructure development."
-        return {
-            'executive_summary': executive_summary,
-            'overall_trends': overall_trends_analysis,
-            'bank_strategies': bank_strategy_analysis,
-            'community_impact': community_impact_analysis,
-            'key_findings': key_findings,
-            'conclusion': conclusion_analysis
-        }
+        
+        self.used_fallback = True
+        # Use meaningful fallback content when AI is not available or failed, instead of empty strings
+        county_name = analysis_data.get('county', 'the analyzed area')
+        years_str = f"{analysis_data.get('years', [2022, 2023, 2024])[0]}-{analysis_data.get('years', [2022, 2023, 2024])[-1]}"
+        return {key: template.format(county_name=county_name, years_str=years_str)
+                for key, template in self._FALLBACK_SECTION_TMPLS.items()}
     
     def format_ai_content(self, content: str) -> List:
         """
@@ -594,15 +716,17 @@ class EnhancedPDFReportGenerator:
         formatted_content = []
         
         # Split content into sections
-        sections = re.split(r'\n\s*\n', content.strip())
+        sections = _SECTION_SPLIT_RE.split(content.strip())
         
         for section in sections:
             section = section.strip()
             if not section:
                 continue
                 
+            kind = _classify_section(section)
+            
             # Check if this is a numbered list
-            if re.match(r'^\d+\.', section):
+            if kind == 'numbered':
                 # Handle numbered lists
                 lines = section.split('\n')
                 for line in lines:
@@ -611,31 +735,29 @@ class EnhancedPDFReportGenerator:
                         # Format numbered items and convert bank names to proper case
                         formatted_line = f"• {self.convert_bank_names_to_proper_case(line)}"
                         formatted_content.append(Paragraph(formatted_line, self.numbered_style))
-                formatted_content.append(Spacer(1, 8))
+                formatted_content.append(_SPACER_8)
                 
             # Check if this is a bullet point list
-            elif section.startswith('•') or section.startswith('-') or section.startswith('*'):
+            elif kind == 'bullet':
                 # Handle bullet point lists
                 lines = section.split('\n')
                 for line in lines:
                     line = line.strip()
                     if line:
                         # Clean up bullet point markers and convert bank names to proper case
-                        line = re.sub(r'^[•\-*]\s*', '', line)
+                        line = _BULLET_STRIP_RE.sub('', line)
                         formatted_line = f"• {self.convert_bank_names_to_proper_case(line)}"
                         formatted_content.append(Paragraph(formatted_line, self.bullet_style))
-                formatted_content.append(Spacer(1, 8))
+                formatted_content.append(_SPACER_8)
                 
             # Check if this is a subsection heading (very specific pattern)
-            elif (re.match(r'^[A-Z][A-Z\s]{2,10}:$', section) or 
-                  re.match(r'^[A-Z][a-z\s]{2,15}:$', section)):
+            elif kind == 'heading':
                 # Handle subsection headings - only short, specific phrases that end with colon
                 # This prevents normal sentences from being treated as headers
-                formatted_content.append(Paragraph(f"<b>{section}</b>", self.subsection_style))
-                formatted_content.append(Spacer(1, 5))
+                formatted_content.extend((Paragraph(f"<b>{section}</b>", self.subsection_style), _SPACER_5))
                 
             # Check if this contains bold keywords - improved logic
-            elif '**' in section or '*' in section:
+            elif kind == 'bold':
                 # Handle bold keywords with improved logic
                 # First, check if the entire section is wrapped in ** (which we don't want)
                 if section.startswith('**') and section.endswith('**') and section.count('**') == 2:
@@ -645,16 +767,16 @@ class EnhancedPDFReportGenerator:
                 else:
                     # Handle inline bold text properly
                     # Replace **text** with <b>text</b> for inline bold
-                    formatted_section = re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', section)
+                    formatted_section = _BOLD_DOUBLE_RE.sub(r'<b>\1</b>', section) if '**' in section else section
                     # Replace *text* with <b>text</b> for single asterisk bold (if not already handled)
-                    formatted_section = re.sub(r'(?<!\*)\*([^*]+)\*(?!\*)', r'<b>\1</b>', formatted_section)
+                    if '*' in formatted_section:
+                        formatted_section = _BOLD_SINGLE_RE.sub(r'<b>\1</b>', formatted_section)
                     formatted_content.append(Paragraph(self.convert_bank_names_to_proper_case(formatted_section), self.body_style))
-                formatted_content.append(Spacer(1, 8))
+                formatted_content.append(_SPACER_8)
                 
             else:
                 # Regular paragraph
-                formatted_content.append(Paragraph(self.convert_bank_names_to_proper_case(section), self.body_style))
-                formatted_content.append(Spacer(1, 8))
+                formatted_content.extend((Paragraph(self.convert_bank_names_to_proper_case(section), self.body_style), _SPACER_8))
         
         return formatted_content
     
@@ -682,12 +804,12 @@ class EnhancedPDFReportGenerator:
                 continue
                 
             # Check if this is a numbered item
-            if re.match(r'^\d+\.', line):
+            if _NUMBERED_RE.match(line):
                 # Format numbered items and convert bank names to proper case
                 formatted_content.append(Paragraph(self.convert_bank_names_to_proper_case(line), self.numbered_style))
             elif line.startswith('•') or line.startswith('-') or line.startswith('*'):
                 # Format bullet points and convert bank names to proper case
-                line = re.sub(r'^[•\-*]\s*', '', line)
+                line = _BULLET_STRIP_RE.sub('', line)
                 formatted_line = f"• {self.convert_bank_names_to_proper_case(line)}"
                 formatted_content.append(Paragraph(formatted_line, self.bullet_style))
             else:
@@ -727,24 +849,24 @@ class EnhancedPDFReportGenerator:
         
         # Enhanced Cover Page
         counties_str = " and ".join(self.counties)
-        years_str = f"{self.years[0]}–{self.years[-1]}"
+        years_str = f"{self._first_year}–{self._last_year}"
         logo_path = "./ncrc_logo.jpg"
         if os.path.exists(logo_path):
             from reportlab.platypus import Image
             logo_img = Image(logo_path, width=2.8*inch, height=1*inch)
-            complete_story.append(logo_img)
-            complete_story.append(Spacer(1, 20))
+            complete_story.extend((logo_img, _SPACER_20))
         else:
-            complete_story.append(Paragraph("[NCRC LOGO]", self.subtitle_style))
-            complete_story.append(Spacer(1, 20))
+            complete_story.extend((Paragraph("[NCRC LOGO]", self.subtitle_style), _SPACER_20))
         # Title with line breaks
         title_text = f"{counties_str}<br/>Bank Branch Trends<br/>({years_str})"
-        complete_story.append(Paragraph(title_text, self.title_style))
-        complete_story.append(Spacer(1, 40))
-        complete_story.append(Paragraph("AI-Powered Banking Market Intelligence", self.subtitle_style))
-        complete_story.append(Spacer(1, 30))
-        complete_story.append(Paragraph(f"Report Generated: {datetime.now().strftime('%B %d, %Y')}", self.body_style))
-        complete_story.append(PageBreak())
+        complete_story.extend((
+            Paragraph(title_text, self.title_style),
+            Spacer(1, 40),
+            Paragraph("AI-Powered Banking Market Intelligence", self.subtitle_style),
+            Spacer(1, 30),
+            Paragraph(f"Report Generated: {datetime.now().strftime('%B %d, %Y')}", self.body_style),
+            PageBreak()
+        ))
         self.page_breaks_count += 1
         
         # Calculate all enhanced data
@@ -778,7 +900,7 @@ class EnhancedPDFReportGenerator:
                         aggregated_row['mmct_pct'] = (aggregated_row['mmct'] / aggregated_row['total_branches'] * 100).round(2)
                     
                     # Recalculate year-over-year changes
-                    if year > min(self.years):
+                    if year > self._first_year:
                         prev_year = year - 1
                         prev_year_data = []
                         for county in self.counties:
@@ -792,7 +914,7 @@ class EnhancedPDFReportGenerator:
                             aggregated_row['total_yoy_change_abs'] = aggregated_row['total_branches'] - prev_total
                     
                     # Recalculate cumulative changes from first year
-                    first_year = min(self.years)
+                    first_year = self._first_year
                     if year > first_year:
                         first_year_data = []
                         for county in self.counties:
@@ -879,14 +1001,6 @@ class EnhancedPDFReportGenerator:
                 if county in comparisons:
                     combined_comparisons[county] = comparisons[county]
             
-            ai_analysis = self.generate_enhanced_ai_analysis(
-                {'county': ' and '.join(self.counties)},
-                combined_trends,
-                combined_market_shares,
-                combined_bank_analysis,
-                combined_comparisons
-            )
-            
             # Use combined data for the rest of the report
             trends = {'combined': combined_trends}
             market_shares = {'combined': combined_market_shares}
@@ -897,10 +1011,25 @@ class EnhancedPDFReportGenerator:
             # Single county - use original data
             counties_to_process = self.counties
         
-        # Generate enhanced AI analysis for each county/combined area (narrative only)
-        for county in counties_to_process:
+        # Generate enhanced AI analysis for every county/combined area (narrative only) concurrently;
+        # the requests are network-bound, while the flowables below are built on this thread
+        counties_with_data = [county for county in counties_to_process if county in trends and county in market_shares]
+        with ThreadPoolExecutor(max_workers=max(len(counties_with_data), 1)) as executor:
+            pending_ai_analysis = {
+                county: executor.submit(
+                    self.generate_enhanced_ai_analysis,
+                    {'county': ' and '.join(self.counties) if county == 'combined' else county},
+                    trends[county],
+                    market_shares[county],
+                    bank_analysis.get(county, pd.DataFrame()),
+                    comparisons.get(county, {})
+                )
+                for county in counties_with_data
+            }
+            
+            for county in counties_to_process:
                 # Skip counties that don't have data
-                if county not in trends or county not in market_shares:
+                if county not in pending_ai_analysis:
                     print(f"Warning: No data available for county: {county}")
                     continue
                 
@@ -908,23 +1037,7 @@ class EnhancedPDFReportGenerator:
                 county_market_shares = market_shares[county]
                 county_bank_analysis = bank_analysis.get(county, pd.DataFrame())
                 county_comparisons = comparisons.get(county, {})
-                if county == 'combined':
-                    # Use the already generated AI analysis for combined data
-                    ai_analysis = self.generate_enhanced_ai_analysis(
-                        {'county': ' and '.join(self.counties)},
-                        county_trends,
-                        county_market_shares,
-                        county_bank_analysis,
-                        county_comparisons
-                    )
-                else:
-                    ai_analysis = self.generate_enhanced_ai_analysis(
-                        {'county': county},
-                        county_trends,
-                        county_market_shares,
-                        county_bank_analysis,
-                        county_comparisons
-                    )
+                ai_analysis = pending_ai_analysis[county].result()
                 
                 # Create safe county name once and reuse it throughout this function
                 if county == 'combined':
@@ -951,12 +1064,10 @@ class EnhancedPDFReportGenerator:
                             clean_paragraph = paragraph.strip()
                             # Remove any ** markers that might cause formatting issues
                             clean_paragraph = clean_paragraph.replace('**', '')
-                            exec_content.append(Paragraph(clean_paragraph, self.body_style))
-                            exec_content.append(Spacer(1, 8))
-                    complete_story.append(KeepTogether([exec_header] + exec_content + [Spacer(1, 20)]))
+                            exec_content.extend((Paragraph(clean_paragraph, self.body_style), _SPACER_8))
+                    complete_story.append(KeepTogether([exec_header] + exec_content + [_SPACER_20]))
                 else:
-                    complete_story.append(exec_header)
-                    complete_story.append(Spacer(1, 20))
+                    complete_story.extend((exec_header, _SPACER_20))
                     
                     # Key Findings Section
                     complete_story.append(PageBreak())
@@ -970,10 +1081,9 @@ class EnhancedPDFReportGenerator:
                 
                 if ai_analysis['key_findings']:
                     key_content = self.format_key_findings(ai_analysis['key_findings'])
-                    complete_story.append(KeepTogether([key_header] + key_content + [Spacer(1, 20)]))
+                    complete_story.append(KeepTogether([key_header] + key_content + [_SPACER_20]))
                 else:
-                    complete_story.append(key_header)
-                    complete_story.append(Spacer(1, 20))
+                    complete_story.extend((key_header, _SPACER_20))
                 
 
                 
@@ -989,49 +1099,32 @@ class EnhancedPDFReportGenerator:
                 
                 if ai_analysis['overall_trends']:
                     trends_content = self.format_ai_content(ai_analysis['overall_trends'])
-                    complete_story.append(KeepTogether([trends_header] + trends_content + [Spacer(1, 20)]))
+                    complete_story.append(KeepTogether([trends_header] + trends_content + [_SPACER_20]))
                 else:
-                    complete_story.append(trends_header)
-                    complete_story.append(Spacer(1, 20))
+                    complete_story.extend((trends_header, _SPACER_20))
                 if not county_trends.empty:
                     if county == 'combined':
                         complete_story.append(Paragraph(f'<a name="trends_table_combined"></a>Detailed Branch Trends Data:', self.subsection_style))
                     else:
                         # Reuse the safe_county already created above
                         complete_story.append(Paragraph(f'<a name="trends_table_{safe_county}"></a>Detailed Branch Trends Data:', self.subsection_style))
-                    trend_data = []
-                    trend_data.append(['Year', 'Total', 'YoY Chg', 'YoY %', 'Cumul %', 'LMI %', 'MMCT %'])
-                    for _, row in county_trends.iterrows():
-                        trend_data.append([
-                            self.format_year(row['year']),
-                            self.format_number(row['total_branches']),
-                        f"{'+' if row['total_yoy_change_abs'] > 0 else ''}{self.format_number(row['total_yoy_change_abs'])}" if not pd.isna(row['total_yoy_change_abs']) else "N/A",
-                        f"{'+' if row['total_yoy_change'] > 0 else ''}{self.format_percentage_table(row['total_yoy_change'])}" if not pd.isna(row['total_yoy_change']) else "N/A",
-                        f"{'+' if row['total_cumulative_change'] > 0 else ''}{self.format_percentage_table(row['total_cumulative_change'])}" if not pd.isna(row['total_cumulative_change']) else "N/A",
-                        self.format_percentage_table(row['lmict_pct']),
-                        self.format_percentage_table(row['mmct_pct'])
-                    ])
-                    trend_table = Table(trend_data, colWidths=[0.8*inch, 1.1*inch, 1*inch, 0.9*inch, 1*inch, 0.9*inch, 0.9*inch])
-                    trend_table.setStyle(TableStyle([
-                        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2d3748')),
-                        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                        ('FONTSIZE', (0, 0), (-1, 0), 10),
-                        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                        ('TOPPADDING', (0, 0), (-1, 0), 12),
-                        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f7fafc')),
-                        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e2e8f0')),
-                        ('FONTSIZE', (0, 1), (-1, -1), 9),
-                        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                        ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-                        ('TOPPADDING', (0, 1), (-1, -1), 8),
-                    ]))
-                    complete_story.append(KeepTogether([trend_table, Spacer(1, 15)]))
+                    trend_data = [['Year', 'Total', 'YoY Chg', 'YoY %', 'Cumul %', 'LMI %', 'MMCT %']]
+                    # Format each column in one pass, then zip the columns into table rows
+                    trend_data.extend(map(list, zip(
+                        self.format_column(county_trends['year'], self.format_year),
+                        self.format_column(county_trends['total_branches'], self.format_number),
+                        self.format_column(county_trends['total_yoy_change_abs'], self.format_number, signed=True),
+                        self.format_column(county_trends['total_yoy_change'], self.format_percentage_table, signed=True),
+                        self.format_column(county_trends['total_cumulative_change'], self.format_percentage_table, signed=True),
+                        self.format_column(county_trends['lmict_pct'], self.format_percentage_table),
+                        self.format_column(county_trends['mmct_pct'], self.format_percentage_table)
+                    )))
+                    trend_table = Table(trend_data, colWidths=_TREND_COLWIDTHS)
+                    trend_table.setStyle(_STANDARD_TABLE_STYLE)
+                    complete_story.append(KeepTogether([trend_table, _SPACER_15]))
                 else:
                     # Add a message if no trends data
-                    complete_story.append(Paragraph("No trends data available for this area.", self.body_style))
-                    complete_story.append(Spacer(1, 15))
+                    complete_story.extend((Paragraph("No trends data available for this area.", self.body_style), _SPACER_15))
                 
                 # Market Concentration Section
                 
@@ -1047,12 +1140,12 @@ class EnhancedPDFReportGenerator:
                 market_concentration_content.append(market_header)
                 
                 # HHI Subsection
-                market_concentration_content.append(Spacer(1, 15))
+                market_concentration_content.append(_SPACER_15)
                 if county == 'combined':
                     market_concentration_content.append(Paragraph(f'<a name="hhi_analysis_combined"></a>Herfindahl-Hirschman Index (HHI) Analysis', self.subsection_style))
                 else:
                     market_concentration_content.append(Paragraph(f'<a name="hhi_analysis_{safe_county}"></a>Herfindahl-Hirschman Index (HHI) Analysis', self.subsection_style))
-                market_concentration_content.append(Spacer(1, 5))
+                market_concentration_content.append(_SPACER_5)
                 
                 # HHI explanation paragraph
                 hhi_explanation = (
@@ -1062,8 +1155,7 @@ class EnhancedPDFReportGenerator:
                     "Markets with HHI above 1,800 are considered 'stuck' and face significant restrictions on merger activity, as they require additional regulatory scrutiny for any proposed consolidation."
                 )
                 
-                market_concentration_content.append(Paragraph(hhi_explanation, self.body_style))
-                market_concentration_content.append(Spacer(1, 15))
+                market_concentration_content.extend((Paragraph(hhi_explanation, self.body_style), _SPACER_15))
                 
                 # HHI Formula display
                 hhi_formula = (
@@ -1071,16 +1163,14 @@ class EnhancedPDFReportGenerator:
                     "HHI = Σ(Market Share²) = Market Share<sub>1</sub>² + Market Share<sub>2</sub>² + ... + Market Share<sub>n</sub>²"
                 )
                 
-                market_concentration_content.append(Paragraph(hhi_formula, self.body_style))
-                market_concentration_content.append(Spacer(1, 15))
+                market_concentration_content.extend((Paragraph(hhi_formula, self.body_style), _SPACER_15))
                 
                 # Add St. Louis Fed source
                 hhi_source = (
                     "<i><font size='8'>Source: <a href='https://www.stlouisfed.org/on-the-economy/2018/june/hhi-competition-community-banks'>Federal Reserve Bank of St. Louis (June 2018)</a></font></i>"
                 )
                 
-                market_concentration_content.append(Paragraph(hhi_source, self.body_style))
-                market_concentration_content.append(Spacer(1, 15))
+                market_concentration_content.extend((Paragraph(hhi_source, self.body_style), _SPACER_15))
                 
                 # Calculate and display actual HHI for this area
                 if not county_market_shares.empty:
@@ -1093,8 +1183,7 @@ class EnhancedPDFReportGenerator:
                         f"<b>Regulatory Status:</b> {interpretation}"
                     )
                     
-                    market_concentration_content.append(Paragraph(hhi_results, self.summary_box_style))
-                    market_concentration_content.append(Spacer(1, 15))
+                    market_concentration_content.extend((Paragraph(hhi_results, self.summary_box_style), _SPACER_15))
                     
                     # Add HHI calculation breakdown table
                     if county == 'combined':
@@ -1109,43 +1198,22 @@ class EnhancedPDFReportGenerator:
                     # Sort by market share descending for better readability
                     sorted_banks = county_market_shares.sort_values('market_share', ascending=False)
                     
-                    for _, row in sorted_banks.iterrows():
-                        market_share = row['market_share']
-                        squared_value = market_share ** 2
-                        total_deposits = row['total_deposits']
+                    deposits_text = self.format_column(sorted_banks['total_deposits'], self.format_number)
+                    share_text = self.format_column(sorted_banks['market_share'], self.format_percentage_table)
+                    squared_values = sorted_banks['market_share'].to_numpy(dtype=np.float64) ** 2
+                    for bank_name, deposits, share, squared_value in zip(sorted_banks['bank_name'].tolist(), deposits_text,
+                                                                         share_text, squared_values.tolist()):
                         breakdown_data.append([
-                            Paragraph(self.to_all_caps(row['bank_name']), ParagraphStyle(
-                                'BankName',
-                                parent=self.body_style,
-                                alignment=TA_CENTER,
-                                fontSize=9,
-                                leading=11,
-                                wordWrap='LTR'
-                            )),
-                            f"${self.format_number(total_deposits)}",
-                            self.format_percentage_table(market_share),
+                            Paragraph(self.to_all_caps(bank_name), self.bank_name_style),
+                            f"${deposits}",
+                            share,
                             f"{squared_value:.0f}"
                         ])
                     
-                    breakdown_table = Table(breakdown_data, colWidths=[2.5*inch, 1.2*inch, 1.2*inch, 1.2*inch])
-                    breakdown_table.setStyle(TableStyle([
-                        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2d3748')),
-                        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                        ('FONTSIZE', (0, 0), (-1, 0), 10),
-                        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                        ('TOPPADDING', (0, 0), (-1, 0), 12),
-                        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f7fafc')),
-                        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e2e8f0')),
-                        ('FONTSIZE', (0, 1), (-1, -1), 9),
-                        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                        ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-                        ('TOPPADDING', (0, 1), (-1, -1), 8),
-                        ('VALIGN', (0, 1), (0, -1), 'MIDDLE'),
-                    ]))
+                    breakdown_table = Table(breakdown_data, colWidths=_BREAKDOWN_COLWIDTHS)
+                    breakdown_table.setStyle(_STANDARD_TABLE_STYLE_WITH_VALIGN)
                     
-                    market_concentration_content.append(KeepTogether([hhi_breakdown_header, breakdown_table, Spacer(1, 15)]))
+                    market_concentration_content.append(KeepTogether([hhi_breakdown_header, breakdown_table, _SPACER_15]))
                 
                 # Add market share table for top banks
                 if not county_market_shares.empty:
@@ -1163,92 +1231,52 @@ class EnhancedPDFReportGenerator:
                     # Calculate total branches for branch-based market share (only for this table display)
                     total_branches = top_bank_data['total_branches'].sum()
                     
-                    for _, row in top_bank_data.iterrows():
-                        # Calculate branch-based market share for this table only
-                        branch_market_share = (row['total_branches'] / total_branches * 100) if total_branches > 0 else 0
-                        
-                        bank_table_data.append([
-                            Paragraph(self.to_all_caps(row['bank_name']), ParagraphStyle(
-                                'BankName',
-                                parent=self.body_style,
-                                alignment=TA_CENTER,
-                                fontSize=9,
-                                leading=11,
-                                wordWrap='LTR'
-                            )),
-                            self.format_number(row['total_branches']),
-                            self.format_percentage_table(branch_market_share),
-                            self.format_percentage_table(row['lmict_pct']),
-                            self.format_percentage_table(row['mmct_pct'])
-                        ])
+                    # Branch-based market share for this table only
+                    if total_branches > 0:
+                        branch_market_share = top_bank_data['total_branches'] / total_branches * 100
+                    else:
+                        branch_market_share = np.zeros(len(top_bank_data))
+                    columns = zip(
+                        top_bank_data['bank_name'].tolist(),
+                        self.format_column(top_bank_data['total_branches'], self.format_number),
+                        self.format_column(branch_market_share, self.format_percentage_table),
+                        self.format_column(top_bank_data['lmict_pct'], self.format_percentage_table),
+                        self.format_column(top_bank_data['mmct_pct'], self.format_percentage_table)
+                    )
+                    for bank_name, *cells in columns:
+                        bank_table_data.append([Paragraph(self.to_all_caps(bank_name), self.bank_name_style), *cells])
                     
-                    bank_table = Table(bank_table_data, colWidths=[2.5*inch, 1.1*inch, 1.1*inch, 0.9*inch, 0.9*inch])
-                    bank_table.setStyle(TableStyle([
-                        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2d3748')),
-                        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                        ('FONTSIZE', (0, 0), (-1, 0), 10),
-                        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                        ('TOPPADDING', (0, 0), (-1, 0), 12),
-                        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f7fafc')),
-                        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e2e8f0')),
-                        ('FONTSIZE', (0, 1), (-1, -1), 9),
-                        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                        ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-                        ('TOPPADDING', (0, 1), (-1, -1), 8),
-                        ('VALIGN', (0, 1), (0, -1), 'MIDDLE'),
-                    ]))
+                    bank_table = Table(bank_table_data, colWidths=_BANK_COLWIDTHS)
+                    bank_table.setStyle(_STANDARD_TABLE_STYLE_WITH_VALIGN)
                     
-                    market_concentration_content.append(KeepTogether([market_share_header, bank_table, Spacer(1, 15)]))
+                    market_concentration_content.append(KeepTogether([market_share_header, bank_table, _SPACER_15]))
                     
                     # Add Growth Analysis section
                     if not county_bank_analysis.empty:
                         if county == 'combined':
                             growth_header = Paragraph(f'<a name="growth_analysis_combined"></a><b>Growth Analysis:</b> The following table shows how the branch counts for these top banks '
-                                f"have evolved from {self.years[0]} to {self.years[-1]}, including absolute and percentage changes:", self.body_style)
+                                f"have evolved from {self._first_year} to {self._last_year}, including absolute and percentage changes:", self.body_style)
                         else:
                             growth_header = Paragraph(f'<a name="growth_analysis_{safe_county}"></a><b>Growth Analysis:</b> The following table shows how the branch counts for these top banks '
-                                f"have evolved from {self.years[0]} to {self.years[-1]}, including absolute and percentage changes:", self.body_style)
+                                f"have evolved from {self._first_year} to {self._last_year}, including absolute and percentage changes:", self.body_style)
                         
                         growth_data = []
-                        growth_data.append(['Bank', f'Branches\n({self.years[0]})', f'Branches\n({self.years[-1]})', f'Absolute\nChange', f'Percentage\nChange %'])
+                        growth_data.append(['Bank', f'Branches\n({self._first_year})', f'Branches\n({self._last_year})', f'Absolute\nChange', f'Percentage\nChange %'])
                         
-                        for _, row in county_bank_analysis.iterrows():
-                            growth_data.append([
-                                Paragraph(self.to_all_caps(row['bank_name']), ParagraphStyle(
-                                    'BankName',
-                                    parent=self.body_style,
-                                    alignment=TA_CENTER,
-                                    fontSize=9,
-                                    leading=11,
-                                    wordWrap='LTR'
-                                )),
-                                self.format_number(row['first_year_branches']),
-                                self.format_number(row['last_year_branches']),
-                                f"{'+' if row['absolute_change'] > 0 else ''}{row['absolute_change']}",
-                                f"{'+' if row['percentage_change'] > 0 else ''}{self.format_percentage_table(row['percentage_change'])}"
-                            ])
+                        columns = zip(
+                            county_bank_analysis['bank_name'].tolist(),
+                            self.format_column(county_bank_analysis['first_year_branches'], self.format_number),
+                            self.format_column(county_bank_analysis['last_year_branches'], self.format_number),
+                            [f"{change:+d}" if change else "0" for change in county_bank_analysis['absolute_change'].tolist()],
+                            self.format_column(county_bank_analysis['percentage_change'], self.format_percentage_table, signed=True)
+                        )
+                        for bank_name, *cells in columns:
+                            growth_data.append([Paragraph(self.to_all_caps(bank_name), self.bank_name_style), *cells])
                         
-                        growth_table = Table(growth_data, colWidths=[2.5*inch, 1.1*inch, 1.1*inch, 1*inch, 1.8*inch])
-                        growth_table.setStyle(TableStyle([
-                            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2d3748')),
-                            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                            ('FONTSIZE', (0, 0), (-1, 0), 10),
-                            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                            ('TOPPADDING', (0, 0), (-1, 0), 12),
-                            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f7fafc')),
-                            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e2e8f0')),
-                            ('FONTSIZE', (0, 1), (-1, -1), 9),
-                            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                            ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-                            ('TOPPADDING', (0, 1), (-1, -1), 8),
-                            ('VALIGN', (0, 1), (0, -1), 'MIDDLE'),
-                        ]))
+                        growth_table = Table(growth_data, colWidths=_GROWTH_COLWIDTHS)
+                        growth_table.setStyle(_STANDARD_TABLE_STYLE_WITH_VALIGN)
                         
-                        market_concentration_content.append(KeepTogether([growth_header, growth_table, Spacer(1, 15)]))
+                        market_concentration_content.append(KeepTogether([growth_header, growth_table, _SPACER_15]))
                     
                     # Add Community Impact Analysis section
                     if not county_bank_analysis.empty:
@@ -1289,7 +1317,7 @@ class EnhancedPDFReportGenerator:
                                 f"Banks with higher percentages than the average are marked with ▲, while those below average are marked with ▼."
                             )
                             
-                            market_concentration_content.append(KeepTogether([community_impact_header, Spacer(1, 10), Paragraph(community_narrative, self.body_style), Spacer(1, 15)]))
+                            market_concentration_content.append(KeepTogether([community_impact_header, _SPACER_10, Paragraph(community_narrative, self.body_style), _SPACER_15]))
                             
                             # Create community impact comparison table
                             if county == 'combined':
@@ -1300,54 +1328,38 @@ class EnhancedPDFReportGenerator:
                             comparison_data = []
                             comparison_data.append(['Bank', 'LMI %', 'MMCT %', 'LMI vs\nAvg', 'MMCT vs\nAvg'])
                             
-                            for _, row in county_bank_analysis.iterrows():
-                                bank_current = county_market_shares[county_market_shares['bank_name'] == row['bank_name']]
-                                if not bank_current.empty:
-                                    bank_lmi = bank_current.iloc[0]['lmict_pct']
-                                    bank_mmct = bank_current.iloc[0]['mmct_pct']
-                                    lmi_vs_avg = "▲" if bank_lmi > county_comparisons['county_avg_lmict'] else "▼" if bank_lmi < county_comparisons['county_avg_lmict'] else "●"
-                                    mmct_vs_avg = "▲" if bank_mmct > county_comparisons['county_avg_mmct'] else "▼" if bank_mmct < county_comparisons['county_avg_mmct'] else "●"
-                                    comparison_data.append([
-                                        Paragraph(self.to_all_caps(row['bank_name']), ParagraphStyle(
-                                            'BankName',
-                                            parent=self.body_style,
-                                            alignment=TA_CENTER,
-                                            fontSize=9,
-                                            leading=11,
-                                            wordWrap='LTR'
-                                        )),
-                                        self.format_percentage_table(bank_lmi),
-                                        self.format_percentage_table(bank_mmct),
-                                        lmi_vs_avg,
-                                        mmct_vs_avg
-                                    ])
+                            # Current LMI/MMCT shares of each growth-table bank, matched in one merge
+                            current = county_bank_analysis[['bank_name']].merge(
+                                county_market_shares[['bank_name', 'lmict_pct', 'mmct_pct']].drop_duplicates('bank_name'),
+                                on='bank_name', how='left', indicator=True
+                            )
+                            found = (current['_merge'] == 'both').to_numpy()
+                            bank_lmi = current['lmict_pct'].to_numpy(dtype=np.float64)
+                            bank_mmct = current['mmct_pct'].to_numpy(dtype=np.float64)
+                            avg_lmi = county_comparisons['county_avg_lmict']
+                            avg_mmct = county_comparisons['county_avg_mmct']
+                            lmi_vs_avg = np.where(bank_lmi > avg_lmi, "▲", np.where(bank_lmi < avg_lmi, "▼", "●"))
+                            mmct_vs_avg = np.where(bank_mmct > avg_mmct, "▲", np.where(bank_mmct < avg_mmct, "▼", "●"))
+                            
+                            columns = zip(
+                                current['bank_name'][found].tolist(),
+                                self.format_column(bank_lmi[found], self.format_percentage_table),
+                                self.format_column(bank_mmct[found], self.format_percentage_table),
+                                lmi_vs_avg[found].tolist(),
+                                mmct_vs_avg[found].tolist()
+                            )
+                            for bank_name, *cells in columns:
+                                comparison_data.append([Paragraph(self.to_all_caps(bank_name), self.bank_name_style), *cells])
                             
-                            comparison_table = Table(comparison_data, colWidths=[2.5*inch, 0.9*inch, 0.9*inch, 1.1*inch, 1.2*inch])
-                            comparison_table.setStyle(TableStyle([
-                                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2d3748')),
-                                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                                ('TOPPADDING', (0, 0), (-1, 0), 12),
-                                ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f7fafc')),
-                                ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e2e8f0')),
-                                ('FONTSIZE', (0, 1), (-1, -1), 9),
-                                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                                ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-                                ('TOPPADDING', (0, 1), (-1, -1), 8),
-                                ('VALIGN', (0, 1), (0, -1), 'MIDDLE'),
-                            ]))
+                            comparison_table = Table(comparison_data, colWidths=_COMPARISON_COLWIDTHS)
+                            comparison_table.setStyle(_STANDARD_TABLE_STYLE_WITH_VALIGN)
                             
-                            market_concentration_content.append(KeepTogether([comparison_header, comparison_table, Spacer(1, 15)]))
+                            market_concentration_content.append(KeepTogether([comparison_header, comparison_table, _SPACER_15]))
                             
                             # Add explanatory paragraphs after the table - dynamically generated based on actual data
                             # Count banks above/below average for dynamic insights
-                            banks_above_lmi_avg = sum(1 for _, row in county_bank_analysis.iterrows() 
-                                                    if county_market_shares[county_market_shares['bank_name'] == row['bank_name']].iloc[0]['lmict_pct'] > county_comparisons['county_avg_lmict'])
-                            banks_above_mmct_avg = sum(1 for _, row in county_bank_analysis.iterrows() 
-                                                     if county_market_shares[county_market_shares['bank_name'] == row['bank_name']].iloc[0]['mmct_pct'] > county_comparisons['county_avg_mmct'])
+                            banks_above_lmi_avg = int((bank_lmi > avg_lmi).sum())
+                            banks_above_mmct_avg = int((bank_mmct > avg_mmct).sum())
                             
                             # Get top performers for dynamic description
                             top_lmi_bank = county_market_shares.loc[county_market_shares['lmict_pct'].idxmax(), 'bank_name'] if not county_market_shares.empty else "N/A"
@@ -1369,73 +1381,48 @@ class EnhancedPDFReportGenerator:
                                 f"and where additional investment in underserved areas could be beneficial."
                             )
                             
-                            market_concentration_content.append(Paragraph(explanation_para1, self.body_style))
-                            market_concentration_content.append(Spacer(1, 10))
-                            market_concentration_content.append(Paragraph(explanation_para2, self.body_style))
-                            market_concentration_content.append(Spacer(1, 15))
+                            market_concentration_content.extend((
+                                Paragraph(explanation_para1, self.body_style),
+                                _SPACER_10,
+                                Paragraph(explanation_para2, self.body_style),
+                                _SPACER_15
+                            ))
                 
                 # Add all market concentration content to the story
-                complete_story.append(KeepTogether(market_concentration_content))
-                complete_story.append(Spacer(1, 20))
+                complete_story.extend((KeepTogether(market_concentration_content), _SPACER_20))
         
 
         # Methodology and Technical Notes Section
         complete_story.append(PageBreak())
         self.page_breaks_count += 1
         methodology_header = Paragraph('<a name="methodology"></a>Methodology and Technical Notes', self.section_style)
+        provider = AI_PROVIDER.upper()
         methodology_content = [
-            Paragraph(
-                f"<b>Analysis Period:</b> {years_str}<br/>"
-                f"<b>Geographic Scope:</b> {counties_str}<br/>"
-                f"<b>Report Generated:</b> {datetime.now().strftime('%B %d, %Y at %I:%M %p')}<br/>"
-                f"<b>Data Source:</b> FDIC Summary of Deposits<br/>"
-                f"<b>Analysis Method:</b> AI-Powered Statistical Analysis with {self.ai_analyzer.provider.upper()}<br/>"
-                f"<b>Report Type:</b> Comprehensive Market Analysis",
-                self.body_style
-            ),
-            Spacer(1, 15),
-            Paragraph(
-                f"This analysis examines bank branch trends and market concentration using FDIC Summary of Deposits data. "
-                f"The analysis focuses on three key metrics: total branch counts, total deposits, and the percentage of branches in Low-to-Moderate Income (LMI) tracts "
-                f"and Majority-Minority Census Tracts (MMCT). We identify the largest banks by deposit market share "
-                f"and analyze their growth patterns and community impact compared to county averages. Market concentration is measured using the Herfindahl-Hirschman Index (HHI) based on deposit market shares. All analysis is enhanced with "
-                f"AI-powered insights using {self.ai_analyzer.provider.upper()} for deeper interpretation of trends and strategic implications.",
-                self.body_style
-            ),
-            Spacer(1, 15),
-            Paragraph(
-                "<b>Data Definitions:</b><br/>"
-                "• <b>LMICT:</b> Low-to-Moderate Income Census Tracts - areas with median family income below 80% of the area median income<br/>"
-                "• <b>MMCT:</b> Majority-Minority Census Tracts - areas where minority populations represent more than 50% of the total population<br/>"
-                "• <b>Market Share:</b> Percentage of total deposits in the county controlled by each bank (regulatory standard for HHI calculation)",
-                self.body_style
-            ),
-            Spacer(1, 15),
-            Paragraph(
-                f"<b>Analysis Overview:</b> This analysis examines bank branch trends in {', '.join(self.counties)} from {years_str} using FDIC Summary of Deposits data. "
-                f"We focus on three key metrics: total branch counts, the percentage of branches in Low-to-Moderate Income (LMI) tracts, "
-                f"and the percentage of branches in Majority-Minority Census Tracts (MMCT).",
-                self.body_style
-            ),
-            Spacer(1, 15),
-            Paragraph(
-                f"<b>Important Note:</b> MMCT designations increased significantly with the 2020 census and became effective in 2022. "
-                f"This means MMCT percentages may show notable changes between 2021 and 2022, reflecting the updated census data rather than actual branch relocations.",
-                self.body_style
-            )
+            Paragraph(self._METHODOLOGY_SUMMARY_TMPL.format(
+                years_str=years_str, counties_str=counties_str,
+                now=datetime.now().strftime('%B %d, %Y at %I:%M %p'), provider=provider
+            ), self.body_style),
+            _SPACER_15,
+            Paragraph(self._METHODOLOGY_APPROACH_TMPL.format(provider=provider), self.body_style),
+            _SPACER_15,
+            Paragraph(self._DATA_DEFINITIONS_HTML, self.body_style),
+            _SPACER_15,
+            Paragraph(self._ANALYSIS_OVERVIEW_TMPL.format(counties=', '.join(self.counties), years_str=years_str), self.body_style),
+            _SPACER_15,
+            Paragraph(self._MMCT_NOTE_HTML, self.body_style)
         ]
         
         complete_story.append(KeepTogether([methodology_header] + methodology_content))
         
         # Legal Disclaimers Section
-        complete_story.append(Spacer(1, 20))
+        complete_story.append(_SPACER_20)
         legal_header = Paragraph('<a name="legal"></a>Legal Disclaimers', self.section_style)
         legal_content = [
             Paragraph(
                 "<b>1. AI-Generated Content.</b> Portions of the report and analyses generated by NCRC's JustData tool are created using automated and artificial intelligence-based processes. While we strive for accuracy, such content may contain errors, omissions, or biases, and should not be considered definitive, complete, or substitute for professional judgement. You acknowledge and agree that you are solely responsible for evaluating the accuracy, suitability, and applicability of any output before relying on it. All rights in and to AI-generated outputs are granted to you under a limited, non-exclusive, no-transferable license for your internal use only, unless otherwise expressly authorized in writing by NCRC.",
                 self.body_style
             ),
-            Spacer(1, 15),
+            _SPACER_15,
             Paragraph(
                 "<b>2. Use of Public Data.</b> The App may incorporate or rely on publicly available datasets from third-party sources. Such datasets are provided \"as is\" and may contain inaccuracies or be incomplete. NCRC makes no representation or warranty regarding the accuracy, completeness, or timeliness of any public data and disclaims all liability for errors or omissions therein.",
                 self.body_style
@@ -1451,7 +1438,8 @@ class EnhancedPDFReportGenerator:
         print(f"   - Python handled all tables, charts, and formatting")
 
 
-def generate_pdf_report_from_data(data: pd.DataFrame, counties: List[str], years: List[int], output_path: str, ai_sections: Dict[str, str] = None):
+def generate_pdf_report_from_data(data: pd.DataFrame, counties: List[str], years: List[int], output_path: str,
+                                  ai_analyzer: AIAnalyzer = None) -> bool:
     """
     Generate an enhanced PDF report from the given data.
     
@@ -1460,21 +1448,11 @@ def generate_pdf_report_from_data(data: pd.DataFrame, counties: List[str], years
         counties: List of counties analyzed
         years: List of years analyzed
         output_path: Path where to save the PDF
-        ai_sections: Optional dictionary of AI-generated analysis sections
+        ai_analyzer: Optional analyzer for the narrative sections (see EnhancedPDFReportGenerator)
+        
+    Returns:
+        True if every narrative section came from the AI rather than the fallback text
     """
-    generator = EnhancedPDFReportGenerator(data, counties, years)
-    
-    # If AI sections are provided, use them instead of generating new ones
-    if ai_sections:
-        generator.ai_analysis = ai_sections
-    else:
-        # Generate AI analysis as usual
-        generator.ai_analysis = generator.generate_enhanced_ai_analysis(
-            generator.data, 
-            generator.calculate_enhanced_trends(),
-            generator.calculate_enhanced_market_share(),
-            generator.analyze_enhanced_bank_growth(generator.get_enhanced_top_banks(generator.calculate_enhanced_market_share())),
-            generator.calculate_enhanced_comparisons(generator.analyze_enhanced_bank_growth(generator.get_enhanced_top_banks(generator.calculate_enhanced_market_share())))
-        )
-    
-    generator.generate_enhanced_pdf_report(output_path) 
\ No newline at end of file
+    generator = EnhancedPDFReportGenerator(data, counties, years, ai_analyzer)
+    generator.generate_enhanced_pdf_report(output_path)
+    return not generator.used_fallback
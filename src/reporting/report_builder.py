@@ -5,28 +5,44 @@ Handles data processing, trend analysis, and Excel export.
 
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any, Tuple
+import xlsxwriter
+from typing import List, Dict, Any, Optional, Tuple, Union
 from datetime import datetime
 import os
 
 
-def build_report(raw_data: List[Dict[str, Any]], counties: List[str], years: List[int]) -> Dict[str, pd.DataFrame]:
+def percentage(numerator, denominator, decimals: Optional[int] = 1) -> np.ndarray:
+    """
+    Compute numerator / denominator * 100 element-wise, rounded, with 0 where the denominator is 0.
+    
+    Works on whole columns at once, so callers never loop over rows. Rows
+    without a positive denominator are never divided, so no divide-by-zero
+    warnings are raised. Pass decimals=None to skip rounding.
+    """
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    out = np.zeros(np.broadcast(numerator, denominator).shape)
+    result = np.divide(numerator, denominator, out=out, where=denominator > 0) * 100
+    return result if decimals is None else result.round(decimals)
+
+
+def build_report(raw_data: Union[pd.DataFrame, List[Dict[str, Any]]], counties: List[str], years: List[int]) -> Dict[str, pd.DataFrame]:
     """
     Process raw BigQuery data and build comprehensive report dataframes.
     
     Args:
-        raw_data: List of dictionaries from BigQuery results
+        raw_data: BigQuery results, as a DataFrame or a list of dictionaries
         counties: List of counties in the report
         years: List of years in the report
         
     Returns:
         Dictionary containing multiple dataframes for different report sections
     """
-    if not raw_data:
+    if len(raw_data) == 0:
         raise ValueError("No data provided for report building")
     
     # Convert to DataFrame
-    df = pd.DataFrame(raw_data)
+    df = raw_data if isinstance(raw_data, pd.DataFrame) else pd.DataFrame(raw_data)
     
     # Ensure required columns exist
     required_columns = ['bank_name', 'year', 'geoid5', 'county_state', 'total_branches', 'lmict', 'mmct']
@@ -54,7 +70,11 @@ def clean_data(df: pd.DataFrame) -> pd.DataFrame:
     # Convert numeric columns
     numeric_columns = ['total_branches', 'lmict', 'mmct']
     for col in numeric_columns:
-        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+        # Arrow-backed query results already arrive as numbers; only parse text columns
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        if df[col].hasnans:
+            df[col] = df[col].fillna(0)
     
     # Convert year to integer
     df['year'] = pd.to_numeric(df['year'], errors='coerce').fillna(0).astype(int)
@@ -81,8 +101,8 @@ def create_summary_table(df: pd.DataFrame, counties: List[str], years: List[int]
     summary.columns = ['County', 'Year', 'Total Branches', 'LMI Branches', 'Minority Branches', 'Number of Banks']
     
     # Calculate percentages
-    summary['LMI %'] = (summary['LMI Branches'] / summary['Total Branches'] * 100).round(1)
-    summary['Minority %'] = (summary['Minority Branches'] / summary['Total Branches'] * 100).round(1)
+    summary['LMI %'] = percentage(summary['LMI Branches'], summary['Total Branches'])
+    summary['Minority %'] = percentage(summary['Minority Branches'], summary['Total Branches'])
     
     return summary
 
@@ -96,8 +116,8 @@ def create_bank_summary(df: pd.DataFrame) -> pd.DataFrame:
     }).reset_index()
     
     # Calculate percentages
-    bank_summary['LMI %'] = (bank_summary['lmict'] / bank_summary['total_branches'] * 100).round(1)
-    bank_summary['Minority %'] = (bank_summary['mmct'] / bank_summary['total_branches'] * 100).round(1)
+    bank_summary['LMI %'] = percentage(bank_summary['lmict'], bank_summary['total_branches'])
+    bank_summary['Minority %'] = percentage(bank_summary['mmct'], bank_summary['total_branches'])
     
     # Rename columns
     bank_summary.columns = ['Bank Name', 'County', 'Year', 'Total Branches', 'LMI Branches', 'Minority Branches', 'LMI %', 'Minority %']
@@ -115,8 +135,8 @@ def create_county_summary(df: pd.DataFrame) -> pd.DataFrame:
     }).reset_index()
     
     # Calculate percentages
-    county_summary['LMI %'] = (county_summary['lmict'] / county_summary['total_branches'] * 100).round(1)
-    county_summary['Minority %'] = (county_summary['mmct'] / county_summary['total_branches'] * 100).round(1)
+    county_summary['LMI %'] = percentage(county_summary['lmict'], county_summary['total_branches'])
+    county_summary['Minority %'] = percentage(county_summary['mmct'], county_summary['total_branches'])
     
     # Rename columns
     county_summary.columns = ['County', 'Year', 'Total Branches', 'LMI Branches', 'Minority Branches', 'Number of Banks', 'LMI %', 'Minority %']
@@ -144,8 +164,8 @@ def create_trend_analysis(df: pd.DataFrame, years: List[int]) -> pd.DataFrame:
     yearly_totals['Minority Branches YoY %'] = yearly_totals['mmct'].pct_change() * 100
     
     # Calculate percentages
-    yearly_totals['LMI %'] = (yearly_totals['lmict'] / yearly_totals['total_branches'] * 100).round(1)
-    yearly_totals['Minority %'] = (yearly_totals['mmct'] / yearly_totals['total_branches'] * 100).round(1)
+    yearly_totals['LMI %'] = percentage(yearly_totals['lmict'], yearly_totals['total_branches'])
+    yearly_totals['Minority %'] = percentage(yearly_totals['mmct'], yearly_totals['total_branches'])
     
     # Rename columns
     yearly_totals.columns = ['Year', 'Total Branches', 'LMI Branches', 'Minority Branches', 'Number of Banks', 
@@ -154,10 +174,50 @@ def create_trend_analysis(df: pd.DataFrame, years: List[int]) -> pd.DataFrame:
     return yearly_totals.round(1)
 
 
+# Sheets written by save_excel_report, in workbook order
+EXCEL_SHEETS = [
+    ('summary', 'Summary'),
+    ('by_bank', 'By Bank'),
+    ('by_county', 'By County'),
+    ('trends', 'Trends'),
+    ('raw_data', 'Raw Data')
+]
+
+
+def _write_sheet(workbook, sheet_name: str, df: pd.DataFrame, header_format):
+    """
+    Write one dataframe to a new worksheet, a whole row at a time.
+    
+    The workbook is in constant_memory mode, which flushes each row once the
+    next one starts, so rows must be written strictly top to bottom. Rows are
+    read straight from the dataframe and column widths are measured as they
+    are written, so the sheet is never copied.
+    """
+    worksheet = workbook.add_worksheet(sheet_name)
+    
+    headers = [str(column) for column in df.columns]
+    worksheet.write_row(0, 0, headers, header_format)
+    widths = [len(header) for header in headers]
+    for row_idx, row in enumerate(df.itertuples(index=False, name=None), start=1):
+        # Missing values become empty cells
+        cells = [None if pd.isna(value) else value for value in row]
+        worksheet.write_row(row_idx, 0, cells)
+        for col_idx, value in enumerate(cells):
+            if value is not None:
+                widths[col_idx] = max(widths[col_idx], len(str(value)))
+    
+    # Auto-adjust column widths from the longest value (or header) in each column
+    for col_idx, width in enumerate(widths):
+        worksheet.set_column(col_idx, col_idx, min(width + 2, 50))
+
+
 def save_excel_report(report_data: Dict[str, pd.DataFrame], output_path: str):
     """
     Save the report data to an Excel file with multiple sheets.
     
+    Written with xlsxwriter in constant_memory mode, so memory use depends on
+    the number of columns rather than on the number of rows.
+    
     Args:
         report_data: Dictionary containing dataframes for different report sections
         output_path: Path where the Excel file should be saved
@@ -165,39 +225,17 @@ def save_excel_report(report_data: Dict[str, pd.DataFrame], output_path: str):
     # Ensure output directory exists
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     
-    # Create Excel writer
-    with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
+    # pct_change yields inf when a prior-year count is 0; write those as Excel errors instead of raising
+    workbook = xlsxwriter.Workbook(output_path, {'constant_memory': True, 'nan_inf_to_errors': True})
+    try:
+        header_format = workbook.add_format({'bold': True, 'border': 1})
         
         # Write each dataframe to a separate sheet
-        if 'summary' in report_data and not report_data['summary'].empty:
-            report_data['summary'].to_excel(writer, sheet_name='Summary', index=False)
-        
-        if 'by_bank' in report_data and not report_data['by_bank'].empty:
-            report_data['by_bank'].to_excel(writer, sheet_name='By Bank', index=False)
-        
-        if 'by_county' in report_data and not report_data['by_county'].empty:
-            report_data['by_county'].to_excel(writer, sheet_name='By County', index=False)
-        
-        if 'trends' in report_data and not report_data['trends'].empty:
-            report_data['trends'].to_excel(writer, sheet_name='Trends', index=False)
-        
-        if 'raw_data' in report_data and not report_data['raw_data'].empty:
-            report_data['raw_data'].to_excel(writer, sheet_name='Raw Data', index=False)
-        
-        # Auto-adjust column widths
-        for sheet_name in writer.sheets:
-            worksheet = writer.sheets[sheet_name]
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
+        for key, sheet_name in EXCEL_SHEETS:
+            if key in report_data and not report_data[key].empty:
+                _write_sheet(workbook, sheet_name, report_data[key], header_format)
+    finally:
+        workbook.close()
 
 
 def generate_report_metadata(counties: List[str], years: List[int], record_count: int) -> Dict[str, Any]:
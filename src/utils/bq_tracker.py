@@ -7,11 +7,12 @@ import sys
 import os
 from typing import List, Dict, Any
 import json
+import pandas as pd
 
 # Add the src directory to the Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from src.utils.bq_utils import get_bigquery_client, find_exact_county_match
+from src.utils.bq_utils import get_bigquery_client, find_exact_county_match, batch_query_config, rows_to_dataframe
 from src.utils.run_logger import run_logger
 from google.cloud import bigquery
 
@@ -73,6 +74,33 @@ class TrackedBigQueryClient:
         except Exception as e:
             raise Exception(f"Error executing BigQuery query for {county} {year}: {e}")
     
+    def execute_query_batch(self, sql_template: str, counties: List[str], years: List[int]) -> pd.DataFrame:
+        """Execute one query covering every county/year combination and track usage."""
+        try:
+            query_job = self.client.query(sql_template, job_config=batch_query_config(counties, years))
+            results = query_job.result()
+            
+            data = rows_to_dataframe(results)
+            
+            # Update tracking
+            self.total_queries += 1
+            self.total_bytes_processed += query_job.total_bytes_processed or 0
+            
+            if self.progress_tracker:
+                self.progress_tracker.update_query_progress(1, 1)
+            
+            run_logger.update_run(
+                self.run_id,
+                bq_queries=self.total_queries,
+                bq_bytes_processed=self.total_bytes_processed,
+                records_processed=len(data)
+            )
+            
+            return data
+            
+        except Exception as e:
+            raise Exception(f"Error executing BigQuery query for {counties} {years}: {e}")
+    
     def get_query_stats(self) -> Dict[str, Any]:
         """Get current query statistics."""
         return {
@@ -5,74 +5,99 @@ BigQuery utilities for FDIC bank branch data analysis.
 
 import sys
 import os
+import threading
+from functools import lru_cache
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'config'))
 from config import PROJECT_ID, get_bq_credentials
 
 from google.cloud import bigquery
 from google.oauth2 import service_account
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 import pandas as pd
 
+# Shared BigQuery client, created on first use by get_bigquery_client()
+_client = None
+_client_lock = threading.Lock()
+
 def get_bigquery_client():
-    """Get BigQuery client using environment-based credentials."""
-    try:
-        if os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"):
-            # Local: use key file
-            credentials = service_account.Credentials.from_service_account_file(
-                os.environ["GOOGLE_APPLICATION_CREDENTIALS"]
-            )
-            client = bigquery.Client(credentials=credentials, project=PROJECT_ID)
-        else:
-            # Cloud Run: use default service account
-            client = bigquery.Client(project=PROJECT_ID)
-        return client
-    except Exception as e:
-        print(f"Error creating BigQuery client: {e}")
-        raise
+    """
+    Get the shared BigQuery client using environment-based credentials.
+    
+    The client is thread-safe, so the concurrent county/year queries all reuse
+    one client (and its connection pool) instead of authenticating per query.
+    """
+    global _client
+    with _client_lock:
+        if _client is not None:
+            return _client
+        try:
+            if os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"):
+                # Local: use key file
+                credentials = service_account.Credentials.from_service_account_file(
+                    os.environ["GOOGLE_APPLICATION_CREDENTIALS"]
+                )
+                _client = bigquery.Client(credentials=credentials, project=PROJECT_ID)
+            else:
+                # Cloud Run: use default service account
+                _client = bigquery.Client(project=PROJECT_ID)
+            return _client
+        except Exception as e:
+            print(f"Error creating BigQuery client: {e}")
+            raise
+
+def parse_county_input(county_input: str) -> Tuple[str, Optional[str]]:
+    """Split "County, State" or "County State" input into (county_name, state); state may be None."""
+    if ',' in county_input:
+        county_name, state = county_input.split(',', 1)
+        return county_name.strip(), state.strip()
+    parts = county_input.strip().split()
+    if len(parts) >= 2:
+        return ' '.join(parts[:-1]), parts[-1]
+    return county_input.strip(), None
+
+def match_counties(county_input: str, all_counties: List[str]) -> List[str]:
+    """
+    Match county input against a list of county names in memory.
+    
+    Uses the same rule as find_exact_county_match: case-insensitive substring
+    matches on the county name and, if given, the state.
+    """
+    county_name, state = parse_county_input(county_input)
+    county_name = county_name.lower()
+    state = state.lower() if state else None
+    return [county for county in all_counties
+            if county_name in county.lower() and (state is None or state in county.lower())]
+
+def find_exact_county_matches(county_inputs: List[str]) -> Dict[str, List[str]]:
+    """
+    Find the possible county matches for several inputs with a single query.
+    
+    Args:
+        county_inputs: County inputs in format "County, State" or "County State"
+    Returns:
+        Dict mapping each input to its list of possible county names (empty if none found)
+    """
+    all_counties = get_available_counties()
+    return {county_input: match_counties(county_input, all_counties) for county_input in county_inputs}
+
+@lru_cache(maxsize=4096)
+def _cached_county_match(county_input: str) -> Tuple[str, ...]:
+    """Matches for one county input against the cached county list (see find_exact_county_match)."""
+    return tuple(match_counties(county_input, get_available_counties()))
 
 def find_exact_county_match(county_input: str) -> list:
     """
     Find all possible county matches from the database.
+    
+    Matches are found in memory against the county list, which is fetched from
+    BigQuery once per process, and remembered per input.
     Args:
         county_input: County input in format "County, State" or "County State"
     Returns:
         List of possible county names from database (empty if none found)
     """
     try:
-        client = get_bigquery_client()
-        # Parse county and state
-        if ',' in county_input:
-            county_name, state = county_input.split(',', 1)
-            county_name = county_name.strip()
-            state = state.strip()
-        else:
-            parts = county_input.strip().split()
-            if len(parts) >= 2:
-                state = parts[-1]
-                county_name = ' '.join(parts[:-1])
-            else:
-                county_name = county_input.strip()
-                state = None
-        # Build query to find matches
-        if state:
-            county_query = f"""
-            SELECT DISTINCT county_state 
-            FROM geo.cbsa_to_county 
-            WHERE LOWER(county_state) LIKE LOWER('%{county_name}%')
-            AND LOWER(county_state) LIKE LOWER('%{state}%')
-            ORDER BY county_state
-            """
-        else:
-            county_query = f"""
-            SELECT DISTINCT county_state 
-            FROM geo.cbsa_to_county 
-            WHERE LOWER(county_state) LIKE LOWER('%{county_name}%')
-            ORDER BY county_state
-            """
-        county_job = client.query(county_query)
-        county_results = list(county_job.result())
-        matches = [row.county_state for row in county_results]
-        return matches
+        return list(_cached_county_match(county_input))
     except Exception as e:
         print(f"Error finding county match for {county_input}: {e}")
         return []
@@ -121,6 +146,52 @@ def execute_query(sql_template: str, county: str, year: int) -> List[Dict[str, A
     except Exception as e:
         raise Exception(f"Error executing BigQuery query for {county} {year}: {e}")
 
+def batch_query_config(counties: List[str], years: List[int]) -> bigquery.QueryJobConfig:
+    """Build the job config binding @counties and @years for the batch SQL template."""
+    return bigquery.QueryJobConfig(query_parameters=[
+        bigquery.ArrayQueryParameter('counties', 'STRING', counties),
+        # Years are compared as strings, matching the quoting in the per-year template
+        bigquery.ArrayQueryParameter('years', 'STRING', [str(year) for year in years])
+    ])
+
+def rows_to_dataframe(rows) -> pd.DataFrame:
+    """
+    Convert a query's result rows to a DataFrame through Arrow record batches.
+    
+    The rows are never materialized as Python dicts, and the Arrow buffers are
+    released column by column as the DataFrame is built, so peak memory stays
+    close to the size of the final DataFrame.
+    """
+    import pyarrow as pa
+    
+    batches = list(rows.to_arrow_iterable())
+    if not batches:
+        return pd.DataFrame()
+    return pa.Table.from_batches(batches).to_pandas(self_destruct=True, split_blocks=True)
+
+def execute_query_batch(sql_template: str, counties: List[str], years: List[int]) -> pd.DataFrame:
+    """
+    Execute one BigQuery query covering every county/year combination.
+    
+    Args:
+        sql_template: SQL query template filtering on @counties and @years arrays
+        counties: Exact county names in "County, State" format (as returned by find_exact_county_match)
+        years: Years as integers
+        
+    Returns:
+        DataFrame of query results, ordered by county and year
+    """
+    try:
+        client = get_bigquery_client()
+        
+        query_job = client.query(sql_template, job_config=batch_query_config(counties, years))
+        results = query_job.result()
+        
+        return rows_to_dataframe(results)
+        
+    except Exception as e:
+        raise Exception(f"Error executing BigQuery query for {counties} {years}: {e}")
+
 def test_connection() -> bool:
     """Test BigQuery connection and return True if successful."""
     try:
@@ -134,23 +205,41 @@ def test_connection() -> bool:
         print(f"BigQuery connection test failed: {e}")
         return False
 
+# Every table the report query reads (see docs/query_templates/branch_report_batch.sql)
+REPORT_TABLES = ("branches.sod", "branches.sod_legacy", "geo.cbsa_to_county")
+
+def table_fingerprint() -> str:
+    """
+    Identify the current contents of the tables the report query reads by their last-modified times and row counts.
+    
+    Reads table metadata only, so no query is billed.
+    """
+    client = get_bigquery_client()
+    tables = [client.get_table(table_id) for table_id in REPORT_TABLES]
+    return ";".join(f"{table.table_id}|{table.modified.isoformat()}|{table.num_rows}" for table in tables)
+
+@lru_cache(maxsize=1)
+def _load_available_counties() -> Tuple[str, ...]:
+    """Query the distinct county names once; failures are not cached, so the next call retries."""
+    print("Getting BigQuery client...")
+    client = get_bigquery_client()
+    print("Client obtained:", client)
+    query = """
+    SELECT DISTINCT county_state 
+    FROM geo.cbsa_to_county 
+    ORDER BY county_state
+    """
+    print("Running query:", query)
+    query_job = client.query(query)
+    results = query_job.result()
+    counties = tuple(row.county_state for row in results)
+    print("Counties fetched:", len(counties))
+    return counties
+
 def get_available_counties() -> List[str]:
-    """Get list of available counties from the database."""
+    """Get list of available counties from the database (queried once per process)."""
     try:
-        print("Getting BigQuery client...")
-        client = get_bigquery_client()
-        print("Client obtained:", client)
-        query = """
-        SELECT DISTINCT county_state 
-        FROM geo.cbsa_to_county 
-        ORDER BY county_state
-        """
-        print("Running query:", query)
-        query_job = client.query(query)
-        results = query_job.result()
-        counties = [row.county_state for row in results]
-        print("Counties fetched:", len(counties))
-        return counties
+        return list(_load_available_counties())
     except Exception as e:
         print(f"Error getting available counties: {e}")
         raise  # Re-raise the exception so fallback logic can catch it
@@ -6,6 +6,7 @@ Tracks costs, queries, user information, and performance metrics.
 
 import os
 import json
+import orjson
 import csv
 import time
 import uuid
@@ -29,7 +30,8 @@ COST_ESTIMATES = {
         "claude-3-5-sonnet-20241022": {"input": 0.003, "output": 0.015},
         "claude-3-opus-20240229": {"input": 0.015, "output": 0.075},
         "claude-3-sonnet-20240229": {"input": 0.003, "output": 0.015},
-        "claude-3-haiku-20240307": {"input": 0.00025, "output": 0.00125}
+        "claude-3-haiku-20240307": {"input": 0.00025, "output": 0.00125},
+        "claude-haiku-4-5-20251001": {"input": 0.001, "output": 0.005}
     },
     "openai": {
         "gpt-4": {"input": 0.03, "output": 0.06},
@@ -186,24 +188,35 @@ class RunLogger:
         
         # Save detailed log
         detailed_file = os.path.join(self.detailed_logs_dir, f"{run_id}.json")
-        with open(detailed_file, 'w') as f:
-            json.dump(metadata.to_dict(), f, indent=2)
+        self._write_run_file(detailed_file, metadata.to_dict())
         
         return run_id
     
+    def _read_run_file(self, detailed_file: str) -> Dict[str, Any]:
+        """Load a run's detailed log."""
+        with open(detailed_file, 'rb') as f:
+            return orjson.loads(f.read())
+    
+    def _write_run_file(self, detailed_file: str, data: Dict[str, Any]):
+        """
+        Save a run's detailed log.
+        
+        Uses orjson, since the file is rewritten on every update_run call during a run.
+        """
+        with open(detailed_file, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    
     def update_run(self, run_id: str, **kwargs):
         """Update run metadata with new information."""
         detailed_file = os.path.join(self.detailed_logs_dir, f"{run_id}.json")
         
         if os.path.exists(detailed_file):
-            with open(detailed_file, 'r') as f:
-                data = json.load(f)
+            data = self._read_run_file(detailed_file)
             
             # Update with new data
             data.update(kwargs)
             
-            with open(detailed_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            self._write_run_file(detailed_file, data)
     
     def upload_run_to_bigquery(self, run_data: dict):
         """
@@ -278,8 +291,7 @@ class RunLogger:
         detailed_file = os.path.join(self.detailed_logs_dir, f"{run_id}.json")
         
         if os.path.exists(detailed_file):
-            with open(detailed_file, 'r') as f:
-                data = json.load(f)
+            data = self._read_run_file(detailed_file)
             
             # Update final data
             data['end_time'] = time.time()
@@ -295,8 +307,7 @@ class RunLogger:
             self._calculate_costs(data)
             
             # Save updated data
-            with open(detailed_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            self._write_run_file(detailed_file, data)
             
             # Add to CSV summary
             self._add_to_csv(data)
@@ -377,8 +388,7 @@ class RunLogger:
         """Get detailed information for a specific run."""
         detailed_file = os.path.join(self.detailed_logs_dir, f"{run_id}.json")
         if os.path.exists(detailed_file):
-            with open(detailed_file, 'r') as f:
-                return json.load(f)
+            return self._read_run_file(detailed_file)
         return None
     
     def get_cost_summary(self) -> Dict[str, Any]:
@@ -5,6 +5,8 @@ Test script for AI-powered analysis functionality.
 
 import sys
 import os
+import time
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
 sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
 
 from analysis.gpt_utils import AIAnalyzer
@@ -128,5 +130,78 @@ def test_ai_analysis():
     
     print("💾 Sample analysis saved to: data/output/sample_ai_analysis.json")
 
+def test_batch_query_parameters():
+    """The batch query binds every county and year as array parameters, years as strings."""
+    from src.utils.bq_utils import batch_query_config
+    
+    config = batch_query_config(['Montgomery County, Maryland', 'Cook County, Illinois'], [2020, 2021])
+    params = {param.name: param for param in config.query_parameters}
+    
+    assert set(params) == {'counties', 'years'}
+    assert params['counties'].array_type == 'STRING'
+    assert params['counties'].values == ['Montgomery County, Maryland', 'Cook County, Illinois']
+    assert params['years'].array_type == 'STRING'
+    assert params['years'].values == ['2020', '2021']
+
+def test_section_cache_expires_and_evicts(tmp_path, monkeypatch):
+    """Cached sections round-trip, expire after the TTL and are capped at the newest entries."""
+    from src.analysis import section_cache
+    
+    monkeypatch.setattr(section_cache, 'AI_SECTION_CACHE_ENABLED', True)
+    monkeypatch.setattr(section_cache, 'AI_SECTION_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(section_cache, 'AI_SECTION_CACHE_MAX_ENTRIES', 2)
+    
+    section_cache.save_sections('a', {'executive_summary': 'Summary', 'key_findings': ''})
+    # Empty sections are not stored, so they are regenerated next time
+    assert section_cache.load_sections('a') == {'executive_summary': 'Summary'}
+    
+    # Entries older than the TTL are ignored
+    expired = time.time() - (section_cache.AI_SECTION_CACHE_TTL_HOURS + 1) * 3600
+    os.utime(tmp_path / 'a.json', (expired, expired))
+    assert section_cache.load_sections('a') == {}
+    
+    # Saving evicts expired entries and everything beyond the newest MAX_ENTRIES
+    for index, key in enumerate(['b', 'c', 'd']):
+        section_cache.save_sections(key, {'executive_summary': key})
+        mtime = time.time() - 10 + index
+        os.utime(tmp_path / f'{key}.json', (mtime, mtime))
+    assert sorted(os.listdir(tmp_path)) == ['c.json', 'd.json']
+
+def test_report_cache_key_and_ttl(tmp_path, monkeypatch):
+    """The report cache key tracks the source data, and stale cached reports are not reused."""
+    from src.core import main
+    
+    monkeypatch.setattr(main, 'REPORT_CACHE_ENABLED', True)
+    monkeypatch.setattr(main, 'REPORT_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(main, 'table_fingerprint', lambda: 'v1')
+    
+    key = main.report_cache_key(['B County, State', 'A County, State'], [2021, 2020])
+    # Counties and years are order-insensitive
+    assert key == main.report_cache_key(['A County, State', 'B County, State'], [2020, 2021])
+    assert key != main.report_cache_key(['A County, State'], [2020, 2021])
+    
+    monkeypatch.setattr(main, 'table_fingerprint', lambda: 'v2')
+    assert key != main.report_cache_key(['A County, State', 'B County, State'], [2020, 2021])
+    
+    # Without a data fingerprint there is no key, so the cache is skipped
+    def unavailable():
+        raise RuntimeError("BigQuery unavailable")
+    monkeypatch.setattr(main, 'table_fingerprint', unavailable)
+    assert main.report_cache_key(['A County, State'], [2020]) is None
+    assert main.restore_cached_report(None, str(tmp_path / 'x.xlsx'), str(tmp_path / 'x.pdf')) is None
+    
+    excel_path, pdf_path = tmp_path / 'report.xlsx', tmp_path / 'report.pdf'
+    excel_path.write_bytes(b'excel')
+    pdf_path.write_bytes(b'pdf')
+    main.store_cached_report(key, str(excel_path), str(pdf_path), 42)
+    
+    restored_excel, restored_pdf = tmp_path / 'restored.xlsx', tmp_path / 'restored.pdf'
+    assert main.restore_cached_report(key, str(restored_excel), str(restored_pdf)) == {'records': 42}
+    assert restored_pdf.read_bytes() == b'pdf'
+    
+    expired = time.time() - (main.REPORT_CACHE_TTL_HOURS + 1) * 3600
+    os.utime(tmp_path / 'cache' / f'{key}.json', (expired, expired))
+    assert main.restore_cached_report(key, str(restored_excel), str(restored_pdf)) is None
+
 if __name__ == "__main__":
     test_ai_analysis() 
\ No newline at end of file
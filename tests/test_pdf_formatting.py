@@ -3,8 +3,14 @@
 Test script to verify PDF formatting functions work correctly.
 """
 
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'reporting'))
+
+import numpy as np
 import pandas as pd
-from pdf_report_generator import EnhancedPDFReportGenerator
+from pdf_report_generator import EnhancedPDFReportGenerator, _format_bank_name_narrative
 
 def test_formatting_functions():
     """Test the new formatting functions with sample AI content."""
@@ -79,5 +85,63 @@ This analysis reveals significant trends in bank branch distribution.
     for i, element in enumerate(formatted_content[:5]):
         print(f"  {i+1}. {type(element).__name__}")
 
+def test_bank_name_narrative_keeps_every_word():
+    """Multi-word bank names must keep all of their words."""
+    assert _format_bank_name_narrative("WELLS FARGO BANK") == "Wells Fargo Bank"
+    formatted = _format_bank_name_narrative("JPMORGAN CHASE BANK, NATIONAL ASSOCIATION")
+    assert len(formatted.split()) == 5
+    assert formatted.startswith("JPMorgan")
+
+def test_percentage_is_zero_without_branches():
+    """Rows with no branches get 0 rather than NaN or inf."""
+    from src.reporting.report_builder import percentage
+    
+    result = percentage(pd.Series([1, 0, 3, 5]), pd.Series([4, 0, 0, 3]))
+    assert list(result) == [25.0, 0.0, 0.0, 166.7]
+    assert np.isfinite(result).all()
+    assert percentage([1], [3], decimals=None)[0] == 1 / 3 * 100
+
+def test_prepare_data_for_pdf_leaves_input_unchanged():
+    """prepare_data_for_pdf returns a new frame and never modifies the raw data."""
+    from src.core.main import prepare_data_for_pdf
+    
+    raw = pd.DataFrame({
+        'bank_name': ['Test Bank 1', 'Test Bank 2'],
+        'total_branches': ['4', None],
+        'lmict': [1, 2],
+        'mmct': [2, None]
+    })
+    before = raw.copy()
+    
+    prepared = prepare_data_for_pdf(raw)
+    
+    pd.testing.assert_frame_equal(raw, before)
+    assert 'lmict_pct' not in raw.columns
+    assert list(prepared['total_branches']) == [4.0, 0.0]
+    assert list(prepared['lmict_pct']) == [25.0, 0.0]
+    assert list(prepared['mmct_pct']) == [50.0, 0.0]
+
+def test_excel_report_writes_missing_and_infinite_values(tmp_path):
+    """NaN and None become empty cells and inf (from pct_change) an Excel error, without raising."""
+    from openpyxl import load_workbook
+    from src.reporting.report_builder import save_excel_report
+    
+    trends = pd.DataFrame({
+        'year': [2020, 2021, 2022],
+        'bank_name': ['Test Bank 1', None, 'Test Bank 3'],
+        'branch_change_pct': [np.nan, np.inf, 12.5]
+    })
+    output_path = str(tmp_path / 'report.xlsx')
+    
+    save_excel_report({'trends': trends}, output_path)
+    
+    sheet = load_workbook(output_path)['Trends']
+    rows = list(sheet.iter_rows(values_only=True))
+    assert rows[0] == ('year', 'bank_name', 'branch_change_pct')
+    assert rows[1] == (2020, 'Test Bank 1', None)
+    assert rows[2] == (2021, None, '#NUM!')
+    assert rows[3] == (2022, 'Test Bank 3', 12.5)
+
 if __name__ == "__main__":
-    test_formatting_functions() 
\ No newline at end of file
+    test_formatting_functions()
+    test_bank_name_narrative_keeps_every_word() 
\ No newline at end of file